@@ -1,6 +1,6 @@
 import json
 import os
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from sentiment_service import score_records
 
 # Path to the fake data file (update if needed)
 input_file = os.path.join(os.path.expanduser('~'), 'Desktop', 'scraped_data.jsonl')
@@ -8,7 +8,6 @@ output_file = 'scraped_data.jsonl'  # For compatibility with training_pipeline.p
 
 sentiments = []
 veracities = []
-analyzer = SentimentIntensityAnalyzer()
 processed_data = []
 
 # Read and process all lines first
@@ -16,12 +15,6 @@ with open(input_file, 'r', encoding='utf-8') as f_in:
     for line in f_in:
         try:
             data = json.loads(line)
-            if data.get('lang') == 'en':
-                data['sentiment'] = analyzer.polarity_scores(data['text'])['compound']
-            else:
-                data['sentiment'] = None
-            if data.get('sentiment') is not None:
-                sentiments.append(data['sentiment'])
             if data.get('veracity') is not None:
                 veracities.append(data['veracity'])
             processed_data.append(data)
@@ -29,6 +22,13 @@ with open(input_file, 'r', encoding='utf-8') as f_in:
             print(f"[ERROR processing line] {e}")
             continue
 
+# Score everything in one batch; the shared service routes by `lang` and
+# reuses cached scores for texts it has seen before.
+for data, score in zip(processed_data, score_records(processed_data)):
+    data['sentiment'] = score
+    if score is not None:
+        sentiments.append(score)
+
 # Write all processed data to output file, with error handling
 try:
     with open(output_file, 'w', encoding='utf-8') as f_out:
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+benchmark_training.py - Offline Training Throughput Benchmark
+
+Generates synthetic datasets at several scales (see `synthetic_data.py`) and
+times `load_and_enrich_data`, `load_scraped_data` and `train_and_save_model`
+on each. Wall time, peak RSS and artifact size are written to a JSON report so
+scaling regressions show up between runs. Each scale runs in a fresh Python
+process so peak-memory numbers are not inherited from a previous scale.
+
+To run: `python benchmark_training.py --scales 1000,10000,100000 --output benchmark_results.json`
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+import platform
+from datetime import datetime
+from pathlib import Path
+
+DEFAULT_SCALES = [1_000, 10_000, 100_000]
+
+def _artifact_bytes(model_dir, version):
+    return sum(p.stat().st_size for p in Path(model_dir).glob(f'*_v{version}.*'))
+
+def run_scale(n_rows, work_dir, compact=False, n_scraped=1000):
+    """Generates data for one scale and benchmarks each pipeline step in this process."""
+    from resource_monitor import track_peak_rss
+    from synthetic_data import generate_datasets
+    import training_pipeline as tp
+
+    scale_dir = Path(work_dir) / f'rows_{n_rows}'
+    model_dir = scale_dir / 'models'
+    # Score sentiment against a cold, private cache: a warm shared one would
+    # hide the scoring cost, and synthetic texts must not land in the user's cache.
+    sentiment_cache = scale_dir / 'sentiment_cache.sqlite3'
+    for suffix in ('', '-wal', '-shm'):
+        Path(f'{sentiment_cache}{suffix}').unlink(missing_ok=True)
+    os.environ['WELLBEING_SENTIMENT_CACHE'] = str(sentiment_cache)
+    stages = []
+    start = time.perf_counter()
+    paths = generate_datasets(scale_dir / 'data', n_rows, n_scraped)
+    generate_seconds = time.perf_counter() - start
+
+    if compact:
+        csv_path = os.path.join(paths['student_alcohol'], 'student-mat.csv')
+        with track_peak_rss('load_context_features', stages):
+            context = tp.load_context_features(paths)
+        with track_peak_rss('load_scraped_data', stages):
+            sentiment, veracity = tp.load_scraped_data(paths['scraped'])
+        with track_peak_rss('train_and_save_model_compact', stages):
+            version, mse = tp.train_and_save_model_compact(csv_path, sentiment, veracity, context, model_dir=model_dir)
+    else:
+        with track_peak_rss('load_and_enrich_data', stages):
+            df = tp.load_and_enrich_data(dataset_paths=paths)
+        with track_peak_rss('load_scraped_data', stages):
+            sentiment, veracity = tp.load_scraped_data(paths['scraped'])
+        with track_peak_rss('train_and_save_model', stages):
+            version, mse = tp.train_and_save_model(df, sentiment, veracity, model_dir=model_dir)
+
+    return {
+        'rows': n_rows,
+        'mode': 'compact' if compact else 'standard',
+        'generate_seconds': generate_seconds,
+        'stages': stages,
+        'mse': mse,
+        'artifact_bytes': _artifact_bytes(model_dir, version) if version is not None else None
+    }
+
+def run_benchmark(scales, work_dir, output, compact=False, n_scraped=1000):
+    results = []
+    for n_rows in scales:
+        print(f"\n=== Benchmarking {n_rows} rows ===")
+        result_file = Path(work_dir) / f'result_{n_rows}.json'
+        cmd = [sys.executable, __file__, '--single-scale', str(n_rows), '--work-dir', str(work_dir),
+               '--scraped', str(n_scraped), '--output', str(result_file)]
+        if compact: cmd.append('--compact')
+        proc = subprocess.run(cmd)
+        if proc.returncode != 0 or not result_file.exists():
+            print(f" -> Scale {n_rows} FAILED (exit code {proc.returncode}).")
+            results.append({'rows': n_rows, 'error': f'exit code {proc.returncode}'})
+            continue
+        with open(result_file, 'r') as f: results.append(json.load(f))
+
+    report = {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': results
+    }
+    with open(output, 'w') as f: json.dump(report, f, indent=4)
+    print(f"\nBenchmark report written to {output}")
+    for result in results:
+        if 'error' in result: continue
+        summary = ', '.join(f"{s['stage']} {s['seconds']:.2f}s" for s in result['stages'])
+        print(f" {result['rows']:>10} rows: {summary}, artifacts {result['artifact_bytes'] / 2**20:.1f} MiB")
+    return report
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the training pipeline on synthetic data.')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)), help='Comma-separated row counts (1k to 10M).')
+    parser.add_argument('--scraped', type=int, default=1000, help='Scraped JSONL records per scale.')
+    parser.add_argument('--work-dir', default='benchmark_work', help='Where synthetic data and models are written.')
+    parser.add_argument('--output', default='benchmark_results.json', help='JSON report path.')
+    parser.add_argument('--compact', action='store_true', help='Benchmark the --low-memory training path.')
+    parser.add_argument('--single-scale', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single_scale is not None:
+        result = run_scale(args.single_scale, args.work_dir, args.compact, args.scraped)
+        with open(args.output, 'w') as f: json.dump(result, f, indent=4)
+    else:
+        scales = [int(s) for s in args.scales.split(',') if s.strip()]
+        run_benchmark(scales, args.work_dir, args.output, args.compact, args.scraped)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+lifestyle_search.py - Minimal-Change Lifestyle Search
+
+Finds the cheapest combinations of lifestyle changes that reach a target
+grade/health. The discrete input grid is ordered by change cost and scored
+in vectorized prediction batches, so small grids cost one `predict` call and
+large grids stop as soon as the cheapest feasible candidates are known.
+"""
+import math
+import numbers
+import itertools
+import numpy as np
+
+from model_inputs import input_matrix, scale_inputs
+
+# Values each searchable input may take (same ranges as the web app sliders).
+SEARCH_GRID = {
+    'studytime': [1, 2, 3, 4],
+    'goout': [1, 2, 3, 4, 5],
+    'total_alcohol': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    'failures': [0, 1, 2, 3, 4]
+}
+DEFAULT_COSTS = {'studytime': 1.0, 'goout': 1.0, 'total_alcohol': 0.5, 'failures': 1.0}
+
+def _is_finite_number(value):
+    return not isinstance(value, bool) and isinstance(value, numbers.Real) and math.isfinite(value)
+
+def validate_search_options(targets=None, costs=None, top_k=5):
+    """
+    Checks user-supplied search options and returns (targets, costs, top_k).
+    Targets may set 'grade' and/or 'health' to finite numbers. Costs must be
+    finite and non-negative (or None to pin a feature): the cost-ordered
+    pruning relies on cost never decreasing as changes grow.
+    Raises ValueError describing the first invalid option.
+    """
+    if targets is None: targets = {}
+    if not isinstance(targets, dict):
+        raise ValueError("'targets' must be an object with optional 'grade' and 'health'.")
+    for target in ('grade', 'health'):
+        if targets.get(target) is not None and not _is_finite_number(targets[target]):
+            raise ValueError(f"Target '{target}' must be a finite number or null.")
+    if isinstance(top_k, bool) or not isinstance(top_k, numbers.Integral) or top_k < 1:
+        raise ValueError("'top_k' must be an integer of at least 1.")
+    if costs is None: costs = {}
+    if not isinstance(costs, dict):
+        raise ValueError("'costs' must be an object mapping feature to cost.")
+    for feature, cost in costs.items():
+        if cost is None: continue
+        if not _is_finite_number(cost) or cost < 0:
+            raise ValueError(f"Cost for '{feature}' must be a finite, non-negative number or null.")
+    return targets, costs, int(top_k)
+
+def _candidate_grid(base_inputs, costs, model_columns):
+    """Returns (features, candidate values, per-candidate cost) sorted by cost."""
+    # A cost of None pins the feature to the user's current value.
+    features = [f for f in SEARCH_GRID if costs.get(f) is not None and f in model_columns]
+    if not features:
+        return features, np.empty((1, 0)), np.zeros(1)
+    candidates = np.array(list(itertools.product(*(SEARCH_GRID[f] for f in features))), dtype=float)
+    base = np.array([base_inputs.get(f, 0) for f in features], dtype=float)
+    weights = np.array([costs[f] for f in features], dtype=float)
+    change_cost = (np.abs(candidates - base) * weights).sum(axis=1)
+    order = np.argsort(change_cost, kind='stable')
+    return features, candidates[order], change_cost[order]
+
+def search_minimal_changes(model, scaler, model_columns, base_inputs, targets, costs=None, top_k=5, batch_size=2048):
+    """
+    Ranks the lowest-cost lifestyle changes whose predicted grade and health
+    meet `targets` ({'grade': ..., 'health': ...}, either key optional).
+    `costs` maps feature -> cost per unit of change and overrides DEFAULT_COSTS.
+    Invalid options raise ValueError (see `validate_search_options`).
+    """
+    targets, costs, top_k = validate_search_options(targets, costs, top_k)
+    costs = {**DEFAULT_COSTS, **costs}
+    min_grade = targets.get('grade')
+    min_health = targets.get('health')
+    features, candidates, change_cost = _candidate_grid(base_inputs, costs, model_columns)
+    base_row = input_matrix([base_inputs], model_columns)[0]
+    col_idx = [model_columns.index(f) for f in features]
+
+    found = []
+    evaluated = 0
+    for start in range(0, len(candidates), batch_size):
+        # Sorted by cost: once top_k feasible candidates are known, nothing
+        # later can be cheaper, so the remaining grid is pruned.
+        if top_k > 0 and len(found) >= top_k and change_cost[start] > found[top_k - 1]['cost']:
+            break
+        batch = candidates[start:start + batch_size]
+        rows = np.tile(base_row, (len(batch), 1))
+        rows[:, col_idx] = batch
+        preds = model.predict(scale_inputs(scaler, rows))
+        evaluated += len(batch)
+        feasible = np.ones(len(batch), dtype=bool)
+        if min_grade is not None: feasible &= preds[:, 0] >= min_grade
+        if min_health is not None: feasible &= preds[:, 1] >= min_health
+        for i in np.flatnonzero(feasible):
+            changes = {
+                f: {'from': base_inputs.get(f, 0), 'to': int(v)}
+                for f, v in zip(features, batch[i]) if v != base_inputs.get(f, 0)
+            }
+            found.append({
+                'changes': changes,
+                'cost': float(change_cost[start + i]),
+                'predicted': {'grade': float(preds[i, 0]), 'health': float(preds[i, 1])}
+            })
+        found.sort(key=lambda r: (r['cost'], len(r['changes']), -r['predicted']['grade']))
+
+    return {
+        'recommendations': found[:top_k],
+        'feasible': bool(found),
+        'evaluated': evaluated,
+        'grid_size': int(len(candidates))
+    }
@@ -6,12 +6,19 @@ This script's ONLY purpose is to write the `model_performance.json` file.
 It is called by the user after the main training pipeline is complete,
 ensuring it runs in a clean process to avoid OS-level errors.
 
-To run: `python log_updater.py --version <num> --mse <num>`
+Before writing, the new version is compared with the current champion using
+the cached holdout evaluations (see `model_evaluation.py`); the log is only
+updated when the configured promotion thresholds are met or `--force` is given.
+
+To run: `python log_updater.py --version <num> --mse <num> [--force]`
 """
+import sys
 import json
 import argparse
 from pathlib import Path
 
+from model_evaluation import decide_promotion, load_thresholds
+
 def update_performance_log(version, mse):
     """Reads the latest model files and writes the performance JSON log."""
     print("\n--- Updating Performance Log ---")
@@ -25,6 +32,8 @@ def update_performance_log(version, mse):
     scaler_filename = model_dir / f'data_scaler_v{version}.joblib'
     columns_filename = model_dir / f'model_columns_v{version}.joblib'
     importance_filename = model_dir / f'feature_importance_v{version}.json'
+    whatif_filename = model_dir / f'whatif_tables_v{version}.json'
+    evaluation_filename = model_dir / f'evaluation_v{version}.json'
 
     # Prepare the data for the JSON file
     performance_data_to_save = {
@@ -33,7 +42,9 @@ def update_performance_log(version, mse):
         'model_file': str(model_filename.resolve()),
         'scaler_file': str(scaler_filename.resolve()),
         'columns_file': str(columns_filename.resolve()),
-        'importance_file': str(importance_filename.resolve())
+        'importance_file': str(importance_filename.resolve()),
+        'whatif_file': str(whatif_filename.resolve()),
+        'evaluation_file': str(evaluation_filename.resolve())
     }
     
     # **FIX:** Define the output path for the log file to be inside the same robust directory.
@@ -48,13 +59,38 @@ def update_performance_log(version, mse):
     except Exception as e:
         print(f"AN ERROR OCCURRED WRITING THE LOG FILE: {e}")
 
+def promote_if_better(version, mse, thresholds=None, force=False):
+    """Runs the champion/challenger check and only then updates the log."""
+    model_dir = Path.home() / "StudentWellbeingProjectModels"
+    print(f"\n--- Champion/Challenger Evaluation for V{version} ---")
+    promote, reasons = decide_promotion(version, model_dir, load_thresholds(model_dir, thresholds))
+    for reason in reasons:
+        print(f" -> {reason}")
+    if not promote and not force:
+        print(f"V{version} was NOT promoted. Re-run with --force to promote it anyway.")
+        return False
+    if not promote:
+        print("Promotion checks not passed, but --force was given.")
+    update_performance_log(version, mse)
+    return True
+
 
 if __name__ == '__main__':
     # Set up to read arguments from the command line
     parser = argparse.ArgumentParser()
     parser.add_argument('--version', type=int, required=True, help='Version number for the log update.')
     parser.add_argument('--mse', type=float, required=True, help='MSE for the log update.')
+    parser.add_argument('--force', action='store_true', help='Promote even if the thresholds are not met.')
+    parser.add_argument('--max-mse-ratio', type=float, help='Max challenger/champion holdout MSE ratio.')
+    parser.add_argument('--max-latency-ratio', type=float, help='Max challenger/champion p50 latency ratio.')
+    parser.add_argument('--max-memory-ratio', type=float, help='Max challenger/champion predict memory ratio.')
     args = parser.parse_args()
     
     # Call the main function with the provided arguments
-    update_performance_log(args.version, args.mse)
+    thresholds = {
+        'max_mse_ratio': args.max_mse_ratio,
+        'max_latency_ratio': args.max_latency_ratio,
+        'max_memory_ratio': args.max_memory_ratio
+    }
+    promoted = promote_if_better(args.version, args.mse, thresholds, force=args.force)
+    sys.exit(0 if promoted else 1)
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+model_evaluation.py - Fixed Holdout & Champion/Challenger Promotion
+
+Keeps one holdout set across all retrains and caches every version's holdout
+predictions plus its measured inference latency and memory. A challenger is
+compared with the current champion using only these cached results, so older
+model versions are never reloaded or re-scored.
+"""
+import json
+import time
+import hashlib
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import joblib
+
+MODEL_DIR = Path.home() / "StudentWellbeingProjectModels"
+HOLDOUT_FILE = 'holdout_set.joblib'
+PROMOTION_CONFIG_FILE = 'promotion_config.json'
+
+# Challenger / champion ratios a new model must stay within to be promoted.
+DEFAULT_THRESHOLDS = {
+    'max_mse_ratio': 1.0,
+    'max_latency_ratio': 1.5,
+    'max_memory_ratio': 1.5
+}
+
+# SECTION 1: FIXED HOLDOUT SET
+# ==============================================================================
+# Scalars broadcast onto every row per run (from the latest scrape); they
+# change between retrains of the same dataset, so they are not fingerprinted.
+RUN_COLUMNS = ('social_sentiment', 'social_veracity')
+
+class HoldoutMismatchError(ValueError):
+    """The stored holdout set was drawn from a different dataset."""
+
+def dataset_fingerprint(columns, blocks):
+    """
+    Content fingerprint a holdout set is tied to: row count, feature columns
+    and a SHA-1 of the data. `blocks` yields (X, y) array chunks in row order;
+    the digest does not depend on chunk size, column order or dtype.
+    """
+    columns = [str(col) for col in columns]
+    order = [i for i in np.argsort(columns) if columns[i] not in RUN_COLUMNS]
+    X_digest, y_digest = hashlib.sha1(), hashlib.sha1()
+    n_rows = 0
+    for X_block, y_block in blocks:
+        X_digest.update(np.ascontiguousarray(np.asarray(X_block, dtype=np.float32)[:, order]).tobytes())
+        y_digest.update(np.ascontiguousarray(y_block, dtype=np.float32).tobytes())
+        n_rows += len(y_block)
+    return {'rows': n_rows, 'columns': sorted(columns), 'sha1': hashlib.sha1((X_digest.hexdigest() + y_digest.hexdigest()).encode()).hexdigest()}
+
+def _holdout_mismatch(holdout, model_dir, details):
+    raise HoldoutMismatchError(
+        f"Holdout set {holdout['id']} in {model_dir} was drawn from a different dataset ({details}). "
+        f"Champion/challenger results are only comparable on one dataset. To start a new champion line, "
+        f"remove {HOLDOUT_FILE} there; the first model scored on the new holdout must be promoted with "
+        f"`log_updater.py --force`."
+    )
+
+def _check_holdout(holdout, fingerprint, n_rows, take_rows, model_dir):
+    """
+    Raises HoldoutMismatchError if `holdout` was drawn from a different
+    dataset. Holdouts saved without a content fingerprint are adopted only if
+    their columns match and their targets equal this dataset's at the same rows.
+    """
+    stored = holdout.get('dataset') or {}
+    if 'sha1' not in stored:
+        positions = np.asarray(holdout['index'])
+        columns = sorted(map(str, holdout['X'].columns))
+        in_range = len(positions) > 0 and positions.min() >= 0 and positions.max() < n_rows
+        same_rows = in_range and np.array_equal(np.asarray(take_rows(positions)[1], dtype=float), np.asarray(holdout['y'], dtype=float))
+        if columns != fingerprint['columns'] or not same_rows:
+            _holdout_mismatch(holdout, model_dir, 'no content fingerprint, and its rows do not match this dataset')
+        print(f"WARNING: holdout set {holdout['id']} has no content fingerprint; its rows match this dataset, adopting it.")
+        holdout['dataset'] = fingerprint
+        joblib.dump(holdout, Path(model_dir) / HOLDOUT_FILE)
+        return
+    mismatched = [f"rows: holdout={stored['rows']} current={fingerprint['rows']}"] if stored['rows'] != fingerprint['rows'] else []
+    if stored['columns'] != fingerprint['columns']: mismatched.append('feature columns differ')
+    if stored['sha1'] != fingerprint['sha1'] and not mismatched: mismatched.append('data content differs')
+    if mismatched: _holdout_mismatch(holdout, model_dir, '; '.join(mismatched))
+
+def _store_holdout(holdout_index, holdout_X, holdout_y, fingerprint, model_dir):
+    holdout_y = np.asarray(holdout_y, dtype=float)
+    digest = hashlib.sha1(holdout_X.to_numpy(dtype=float).tobytes() + holdout_y.tobytes()).hexdigest()[:12]
+    holdout = {'id': digest, 'index': list(holdout_index), 'X': holdout_X, 'y': holdout_y, 'dataset': fingerprint}
+    holdout_path = Path(model_dir) / HOLDOUT_FILE
+    Path(model_dir).mkdir(exist_ok=True)
+    joblib.dump(holdout, holdout_path)
+    print(f"Created fixed holdout set {digest} ({len(holdout_y)} rows) at {holdout_path}")
+    return holdout
+
+def load_or_create_holdout_rows(n_rows, take_rows, columns, blocks, model_dir=MODEL_DIR, test_size=0.2, max_rows=50_000, random_state=42):
+    """
+    Returns (train_mask, holdout) for data addressed by row position.
+    `take_rows(positions)` must return (X DataFrame, y) for the requested rows
+    and `blocks` yields the whole dataset as (X, y) chunks for fingerprinting.
+    The holdout is drawn once (at most `max_rows` rows) and reused unchanged
+    afterwards; a holdout from a different dataset raises HoldoutMismatchError.
+    """
+    fingerprint = dataset_fingerprint(columns, blocks)
+    holdout_path = Path(model_dir) / HOLDOUT_FILE
+    if holdout_path.exists():
+        holdout = joblib.load(holdout_path)
+        _check_holdout(holdout, fingerprint, n_rows, take_rows, model_dir)
+        print(f"Using fixed holdout set {holdout['id']} ({len(holdout['y'])} rows).")
+    else:
+        n_holdout = min(max(1, int(n_rows * test_size)), max_rows)
+        rng = np.random.default_rng(random_state)
+        holdout_index = np.sort(rng.choice(n_rows, size=n_holdout, replace=False))
+        holdout_X, holdout_y = take_rows(holdout_index)
+        holdout = _store_holdout(holdout_index.tolist(), holdout_X, holdout_y, fingerprint, model_dir)
+    train_mask = np.ones(n_rows, dtype=bool)
+    train_mask[np.asarray(holdout['index'])] = False
+    return train_mask, holdout
+
+def load_or_create_holdout(X, y, model_dir=MODEL_DIR, test_size=0.2, max_rows=50_000, random_state=42, chunksize=100_000):
+    """
+    DataFrame variant of `load_or_create_holdout_rows`: the same rows are held
+    out whether a dataset is trained in memory or out of core.
+    """
+    def take_rows(positions): return X.iloc[positions], y.iloc[positions]
+    blocks = ((X.iloc[start:start + chunksize].to_numpy(dtype=np.float32), y.iloc[start:start + chunksize].to_numpy(dtype=np.float32))
+              for start in range(0, len(X), chunksize))
+    return load_or_create_holdout_rows(len(X), take_rows, X.columns, blocks, model_dir, test_size, max_rows, random_state)
+
+def holdout_matrix(holdout, scaler, feature_names):
+    """Aligns the stored holdout rows to the current feature set and scales them."""
+    X_holdout = holdout['X'].reindex(columns=list(feature_names), fill_value=0)
+    return scaler.transform(X_holdout), holdout['y']
+
+# SECTION 2: EVALUATION CACHE
+# ==============================================================================
+def score_on_holdout(model, X_holdout, y_holdout):
+    """Holdout predictions and their MSE (combined and per target). Returns (scores, predictions)."""
+    predictions = np.asarray(model.predict(X_holdout))
+    squared_error = (predictions - y_holdout) ** 2
+    scores = {
+        'mse': float(squared_error.mean()),
+        'mse_grade': float(squared_error[:, 0].mean()),
+        'mse_health': float(squared_error[:, 1].mean())
+    }
+    return scores, predictions
+
+def measure_inference(model, X_holdout, model_file, latency_repeats=25):
+    """
+    Measures single-row inference latency, the wall time and peak allocation
+    of a full holdout `predict`, and the model file size. Run it outside any
+    profiled stage: the promotion gate compares these numbers across versions.
+    If tracemalloc was already running they are skewed by tracing, and the
+    result says so (`measured_while_tracing`) so the gate skips them.
+    """
+    start = time.perf_counter()
+    model.predict(X_holdout)
+    batch_seconds = time.perf_counter() - start
+
+    # Leave an already running tracemalloc session (e.g. the profiler's) running.
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing: tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    model.predict(X_holdout)
+    _, predict_peak = tracemalloc.get_traced_memory()
+    predict_peak -= baseline
+    if not was_tracing: tracemalloc.stop()
+
+    timings = []
+    for i in range(latency_repeats):
+        row = X_holdout[i % len(X_holdout):i % len(X_holdout) + 1]
+        start = time.perf_counter()
+        model.predict(row)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'latency_ms_p50': float(np.percentile(timings, 50)),
+        'latency_ms_p95': float(np.percentile(timings, 95)),
+        'batch_predict_seconds': batch_seconds,
+        'predict_peak_bytes': int(predict_peak),
+        'model_file_bytes': Path(model_file).stat().st_size,
+        'measured_while_tracing': was_tracing
+    }
+
+def evaluate_on_holdout(model, X_holdout, y_holdout, model_file, latency_repeats=25):
+    """`score_on_holdout` plus `measure_inference`. Returns (evaluation dict, holdout predictions)."""
+    scores, predictions = score_on_holdout(model, X_holdout, y_holdout)
+    return {**scores, **measure_inference(model, X_holdout, model_file, latency_repeats)}, predictions
+
+def save_evaluation(version, holdout_id, evaluation, predictions, model_dir=MODEL_DIR):
+    """Caches a version's holdout predictions and evaluation summary."""
+    model_dir = Path(model_dir)
+    joblib.dump(predictions, model_dir / f'holdout_predictions_v{version}.joblib')
+    with open(model_dir / f'evaluation_v{version}.json', 'w') as f:
+        json.dump({'version': version, 'holdout_id': holdout_id, **evaluation}, f, indent=4)
+
+def load_evaluation(version, model_dir=MODEL_DIR):
+    try:
+        with open(Path(model_dir) / f'evaluation_v{version}.json', 'r') as f: return json.load(f)
+    except FileNotFoundError: return None
+
+# SECTION 3: PROMOTION DECISION
+# ==============================================================================
+def load_thresholds(model_dir=MODEL_DIR, overrides=None):
+    """DEFAULT_THRESHOLDS, then `promotion_config.json`, then explicit overrides."""
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    try:
+        with open(Path(model_dir) / PROMOTION_CONFIG_FILE, 'r') as f: thresholds.update(json.load(f))
+    except FileNotFoundError: pass
+    thresholds.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    return thresholds
+
+def _champion_mse(champion, evaluation, holdout, model_dir):
+    """Champion MSE on the current holdout, from its cached predictions (or cached summary)."""
+    if evaluation is None:
+        # Champions from before holdout evaluations existed only have their logged MSE.
+        print(f"WARNING: no holdout evaluation for champion V{champion['version']}; using its logged MSE.")
+        return champion.get('mse')
+    predictions_path = Path(model_dir) / f"holdout_predictions_v{champion['version']}.joblib"
+    if predictions_path.exists():
+        predictions = joblib.load(predictions_path)
+        return float(((predictions - holdout['y']) ** 2).mean())
+    return evaluation['mse']
+
+def decide_promotion(version, model_dir=MODEL_DIR, thresholds=None):
+    """
+    Compares challenger `version` with the champion named in
+    `model_performance.json`. Returns (promote, reasons). Results measured on
+    a holdout other than the current one are never compared; such a
+    challenger can only be promoted with `--force`.
+    """
+    model_dir = Path(model_dir)
+    thresholds = thresholds or load_thresholds(model_dir)
+    challenger = load_evaluation(version, model_dir)
+    if challenger is None:
+        return False, [f"No evaluation found for V{version}; retrain to produce evaluation_v{version}.json."]
+    try:
+        with open(model_dir / 'model_performance.json', 'r') as f: champion = json.load(f)
+    except FileNotFoundError:
+        return True, ["No current champion; promoting first model."]
+    if champion.get('version') == version:
+        return True, [f"V{version} is already the champion."]
+
+    try:
+        holdout = joblib.load(model_dir / HOLDOUT_FILE)
+    except FileNotFoundError:
+        return False, [f"No holdout set in {model_dir}; V{version} cannot be compared with champion V{champion['version']}."]
+    champion_eval = load_evaluation(champion['version'], model_dir)
+    mismatched = [f"V{v} was evaluated on holdout {e.get('holdout_id')}" for v, e in
+                  ((champion['version'], champion_eval), (version, challenger)) if e and e.get('holdout_id') != holdout['id']]
+    if mismatched:
+        return False, [f"{'; '.join(mismatched)}, but the current holdout is {holdout['id']}. "
+                       f"Results on different holdouts are not comparable; promote with --force to start a new champion line."]
+    champion_mse = _champion_mse(champion, champion_eval, holdout, model_dir)
+    checks = [('mse', champion_mse, challenger['mse'], thresholds['max_mse_ratio'])]
+    # Latency and memory measured under tracemalloc are not comparable with untraced runs.
+    traced = [f"V{v}" for v, e in ((champion['version'], champion_eval), (version, challenger)) if e and e.get('measured_while_tracing')]
+    if champion_eval and not traced:
+        checks.append(('latency_ms_p50', champion_eval['latency_ms_p50'], challenger['latency_ms_p50'], thresholds['max_latency_ratio']))
+        checks.append(('predict_peak_bytes', champion_eval['predict_peak_bytes'], challenger['predict_peak_bytes'], thresholds['max_memory_ratio']))
+
+    promote = True
+    reasons = []
+    for metric, old, new, max_ratio in checks:
+        if old is None or old <= 0: continue
+        ratio = new / old
+        passed = ratio <= max_ratio
+        promote &= passed
+        reasons.append(f"{metric}: V{champion['version']}={old:.4f} V{version}={new:.4f} ratio={ratio:.3f} (max {max_ratio}) -> {'OK' if passed else 'FAIL'}")
+    if traced:
+        reasons.append(f"latency/memory not compared: {', '.join(traced)} measured while tracemalloc was running.")
+    return promote, reasons
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+model_inputs.py - Serving-Time Model Inputs
+
+Builds model input rows from request dicts with numpy only, so the web app
+never has to import pandas just to make a one-row frame.
+"""
+import numpy as np
+
+def input_matrix(records, model_columns):
+    """One row per input dict, in `model_columns` order; missing or null values become 0."""
+    column_index = {col: i for i, col in enumerate(model_columns)}
+    X = np.zeros((len(records), len(model_columns)))
+    for row, record in enumerate(records):
+        for key, value in record.items():
+            col = column_index.get(key)
+            if col is not None and value is not None:
+                X[row, col] = value
+    return X
+
+def scale_inputs(scaler, X):
+    """
+    Applies a fitted StandardScaler with plain array arithmetic, skipping the
+    feature-name validation `transform` performs on every call.
+    """
+    if type(scaler).__name__ != 'StandardScaler':
+        return scaler.transform(X)
+    if scaler.with_mean: X = X - scaler.mean_
+    if scaler.with_std: X = X / scaler.scale_
+    return X
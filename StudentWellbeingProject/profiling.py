@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+profiling.py - Opt-in Stage Profiler
+
+Measures named stages of training and serving: wall time, CPU time and the
+tracemalloc peak go to `profile_report.jsonl`, and a sampled call stack goes to
+a `<stage>.collapsed` file that flamegraph.pl or speedscope can read.
+Stages that overlap (e.g. concurrent requests) share one tracemalloc peak; their
+records are flagged `overlapped` and the peak is an upper bound for each.
+
+Disabled by default. Enable with WELLBEING_PROFILE=1 or a script's
+`--profile` flag. When disabled, `stage()` returns a shared no-op context and
+`profile_requests()` leaves the view function unwrapped.
+
+Environment variables:
+    WELLBEING_PROFILE              1 to enable
+    WELLBEING_PROFILE_DIR          output directory (default: ./profiles)
+    WELLBEING_PROFILE_SAMPLE_RATE  fraction of web requests to profile (default: 0.1)
+    WELLBEING_PROFILE_INTERVAL     stack sampling interval in seconds (default: 0.005)
+"""
+import os
+import sys
+import json
+import time
+import random
+import threading
+import functools
+import tracemalloc
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+
+_NULL_STAGE = nullcontext()
+_enabled = os.environ.get('WELLBEING_PROFILE', '').lower() in ('1', 'true', 'yes')
+_write_lock = threading.Lock()
+# Overlapping stages (concurrent requests) share one tracemalloc session and
+# one peak counter, so the peak is only reset when no other stage is in flight.
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_owned = False   # True if a stage started tracing (and so must stop it)
+_peak_baseline = 0
+_stages_entered = 0
+
+def enable(output_dir=None, sample_rate=None):
+    """Turns profiling on for this process and any child processes it starts."""
+    global _enabled
+    _enabled = True
+    os.environ['WELLBEING_PROFILE'] = '1'
+    if output_dir is not None: os.environ['WELLBEING_PROFILE_DIR'] = str(output_dir)
+    if sample_rate is not None: os.environ['WELLBEING_PROFILE_SAMPLE_RATE'] = str(sample_rate)
+
+def is_enabled():
+    return _enabled
+
+def _output_dir():
+    path = Path(os.environ.get('WELLBEING_PROFILE_DIR', 'profiles'))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+# SECTION 1: STACK SAMPLER
+# ==============================================================================
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval into collapsed-stack counts."""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                frame = frame.f_back
+            if frames:
+                self.counts[';'.join(reversed(frames))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+# SECTION 2: STAGE PROFILER
+# ==============================================================================
+class _StageProfiler:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        global _tracemalloc_users, _tracemalloc_owned, _peak_baseline, _stages_entered
+        with _tracemalloc_lock:
+            if _tracemalloc_users == 0:
+                # Leave an already running tracemalloc session (not ours) running.
+                _tracemalloc_owned = not tracemalloc.is_tracing()
+                if _tracemalloc_owned: tracemalloc.start()
+                tracemalloc.reset_peak()
+                _peak_baseline = tracemalloc.get_traced_memory()[0]
+            self._overlapped = _tracemalloc_users > 0
+            _tracemalloc_users += 1
+            _stages_entered += 1
+            self._entry_number = _stages_entered
+        interval = float(os.environ.get('WELLBEING_PROFILE_INTERVAL', 0.005))
+        self._sampler = _StackSampler(threading.get_ident(), interval)
+        self._sampler.start()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _tracemalloc_users
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        self._sampler.stop()
+        with _tracemalloc_lock:
+            peak = max(0, tracemalloc.get_traced_memory()[1] - _peak_baseline)
+            # Another stage ran alongside this one if it was in flight on entry
+            # or entered since; the peak then covers both and is an upper bound.
+            overlapped = self._overlapped or _stages_entered != self._entry_number
+            _tracemalloc_users -= 1
+            if _tracemalloc_users == 0 and _tracemalloc_owned: tracemalloc.stop()
+
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        out_dir = _output_dir()
+        stack_file = out_dir / f'{stamp}_{self.name}.collapsed'
+        record = {
+            'stage': self.name,
+            'timestamp': stamp,
+            'pid': os.getpid(),
+            'wall_seconds': wall,
+            'cpu_seconds': cpu,
+            'tracemalloc_peak_bytes': peak,
+            'overlapped': overlapped,
+            'stack_samples': sum(self._sampler.counts.values()),
+            'stack_file': str(stack_file),
+            'error': exc_type.__name__ if exc_type else None
+        }
+        with _write_lock:
+            with open(stack_file, 'w', encoding='utf-8') as f:
+                for stack, count in self._sampler.counts.most_common():
+                    f.write(f"{stack} {count}\n")
+            with open(out_dir / 'profile_report.jsonl', 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
+        print(f" [profile] {self.name}: wall {wall:.3f}s, cpu {cpu:.3f}s, peak {peak / 2**20:.1f} MiB")
+        return False
+
+def stage(name):
+    """Context manager profiling the wrapped block as stage `name` (no-op when disabled)."""
+    if not _enabled: return _NULL_STAGE
+    return _StageProfiler(name)
+
+def profile_requests(name, sample_rate=None):
+    """
+    View decorator profiling a random fraction of requests. Evaluated once at
+    app creation, so the view is returned untouched when profiling is off.
+    """
+    def decorator(view):
+        if not _enabled: return view
+        rate = sample_rate if sample_rate is not None else float(os.environ.get('WELLBEING_PROFILE_SAMPLE_RATE', 0.1))
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if random.random() >= rate: return view(*args, **kwargs)
+            with _StageProfiler(name):
+                return view(*args, **kwargs)
+        return wrapper
+    return decorator
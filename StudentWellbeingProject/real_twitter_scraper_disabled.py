@@ -2,9 +2,10 @@ import os
 import requests
 import time
 from datetime import datetime
-from textblob import TextBlob
 import json
 
+from sentiment_service import score_records, score_texts
+
 KEYWORDS = ['student stress', 'university burnout', 'exam anxiety', 'college life', 'tugas kuliah', 'stress akademik', 'burnout', '壓力', 'ストレス']
 LANGUAGES = ['en', 'id', 'ms', 'ja', 'ko', 'zh']  # English, Indonesian, Malay, Japanese, Korean, Chinese
 
@@ -36,14 +37,8 @@ def fake_twitter_scraper(query, limit=5, lang='en'):
         return []
 
 def analyze_sentiment(text, lang='en'):
-    try:
-        # TextBlob sentiment only works well for English
-        if lang != 'en':
-            return None
-        blob = TextBlob(text)
-        return blob.sentiment.polarity
-    except Exception:
-        return None
+    # Shared, cached scorer; languages without an analyzer (non-English) get None
+    return score_texts([text], [lang])[0]
 
 if __name__ == '__main__':
     print(f"Writing output to: {OUTPUT_FILE}")
@@ -53,9 +48,9 @@ if __name__ == '__main__':
             for lang in LANGUAGES:
                 query = f"{keyword} lang:{lang}"
                 results = fake_twitter_scraper(query, limit=3, lang=lang)
-                for r in results:
-                    # Add sentiment analysis (only for English)
-                    r['sentiment'] = analyze_sentiment(r['text'], lang=lang)
+                # Add sentiment analysis (only for English), one batch per query
+                for r, score in zip(results, score_records(results)):
+                    r['sentiment'] = score
                     f.write(json.dumps(r, ensure_ascii=False) + '\n')
                     all_results.append(r)
     # Print sentiment summary
@@ -4,9 +4,8 @@ recommendation_app.py -Flask Backend & UI
 """
 
 # Only import what is needed at the top level
-def run_flask():
-    from flask import Flask
-    app = create_app_and_model()
+def run_flask(background_load=None):
+    app = create_app_and_model(background_load)
     app.run(debug=True, port=5000, use_reloader=False)
 
 def run_fake_scraper():
@@ -14,15 +13,29 @@ def run_fake_scraper():
     import subprocess
     subprocess.run([sys.executable, 'real_twitter_scraper_disabled.py'])
 
-def create_app_and_model():
-    import pandas as pd
-    import joblib
-    from flask import Flask, request, jsonify, render_template_string
+def create_app_and_model(background_load=None):
+    """
+    Builds the Flask app. With `background_load` (or WELLBEING_BACKGROUND_LOAD=1)
+    the app is returned immediately and the model artifacts load in a thread;
+    `/ready` reports 503 and prediction routes answer 503 until they are in.
+    """
+    import os
     import json
+    import threading
     from pathlib import Path
+    from flask import Flask, request, jsonify, render_template_string
+    from profiling import profile_requests
+    from response_cache import ResponseCache, make_entry, conditional_response
+    if background_load is None:
+        background_load = os.environ.get('WELLBEING_BACKGROUND_LOAD', '').lower() in ('1', 'true', 'yes')
     app = Flask(__name__)
+    response_cache = ResponseCache()
+    # Swapped in as one dict so a request never sees a half-loaded model.
+    state = {'artifacts': None}
+    loading_done = threading.Event()
 
     def load_latest_model():
+        import joblib  # unpickling pulls in sklearn, so keep it off the import path
         try:
             model_dir = Path.home() / "StudentWellbeingProjectModels"
             performance_log_path = model_dir / 'model_performance.json'
@@ -35,54 +48,82 @@ def create_app_and_model():
             model_columns = joblib.load(performance_data['columns_file'])
             with open(performance_data['importance_file'], 'r') as f:
                 feature_importances = json.load(f)
-            return model, scaler, model_columns, feature_importances
+            whatif_tables = None
+            if performance_data.get('whatif_file') and Path(performance_data['whatif_file']).exists():
+                with open(performance_data['whatif_file'], 'r') as f:
+                    whatif_tables = json.load(f)
+            return {
+                'model': model,
+                'scaler': scaler,
+                'model_columns': model_columns,
+                'feature_importances': feature_importances,
+                'whatif_tables': whatif_tables,
+                'model_version': performance_data.get('version')
+            }
         except FileNotFoundError:
             print(f"\n--- WARNING: 'model_performance.json' not found in {Path.home() / 'StudentWellbeingProjectModels'}. ---")
             print("The application will run, but predictions will fail.")
             print("Please run `training_pipeline.py` and `log_updater.py` first.\n")
-            return None, None, None, None
+            return None
         except Exception as e:
             print(f"An error occurred while loading model artifacts: {e}")
-            return None, None, None, None
+            return None
+
+    def load_model_into_app():
+        state['artifacts'] = load_latest_model()
+        loading_done.set()
+
+    if background_load:
+        threading.Thread(target=load_model_into_app, name='model-loader', daemon=True).start()
+    else:
+        load_model_into_app()
+
+    def model_unavailable():
+        if not loading_done.is_set(): return jsonify({'error': 'Model is still loading.'}), 503
+        return jsonify({'error': 'Model not available.'})
 
-    model, scaler, model_columns, feature_importances = load_latest_model()
+    # The landing page is static, so it is rendered once and revalidated by ETag.
+    with app.app_context():
+        home_page = make_entry(render_template_string(HTML_TEMPLATE).encode('utf-8'), 'text/html; charset=utf-8')
 
     @app.route('/')
     def home():
-        return render_template_string(HTML_TEMPLATE)
+        return conditional_response(home_page, request, cache_control='public, max-age=86400')
 
-    @app.route('/analyze-lifestyle', methods=['POST'])
-    def analyze_lifestyle():
-        if not model: return jsonify({'error': 'Model not available.'})
-        data = request.get_json()
-        base_inputs = data['base_inputs']
-        base_df = pd.DataFrame([base_inputs], columns=model_columns).fillna(0)
-        base_scaled = scaler.transform(base_df)
-        base_prediction = model.predict(base_scaled)[0]
-        current_outcome = {
-            'x': float(base_prediction[1]),
-            'y': float(base_prediction[0])
+    @app.route('/ready')
+    def ready():
+        artifacts = state['artifacts']
+        body = {
+            'ready': artifacts is not None,
+            'loading': not loading_done.is_set(),
+            'model_version': artifacts['model_version'] if artifacts else None
         }
-        scenarios = {}
+        return jsonify(body), 200 if artifacts else 503
+
+    def build_analysis(artifacts, base_inputs):
+        from model_inputs import input_matrix, scale_inputs
         variable_ranges = {
             'studytime': [1, 2, 3, 4],
             'goout': [1, 2, 3, 4, 5],
             'total_alcohol': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
         }
-        for key, value_range in variable_ranges.items():
-            scenario_results = []
-            for value in value_range:
-                scenario_input = base_inputs.copy()
-                scenario_input[key] = value
-                input_df = pd.DataFrame([scenario_input], columns=model_columns).fillna(0)
-                input_scaled = scaler.transform(input_df)
-                prediction = model.predict(input_scaled)[0]
-                scenario_results.append({
-                    'x': float(prediction[1]),
-                    'y': float(prediction[0]),
-                    'value': value
-                })
-            scenarios[key] = scenario_results
+        # The base row and every scenario row are scored in a single predict call.
+        scenario_keys = [(key, value) for key, value_range in variable_ranges.items() for value in value_range]
+        records = [base_inputs] + [{**base_inputs, key: value} for key, value in scenario_keys]
+        X = input_matrix(records, artifacts['model_columns'])
+        predictions = artifacts['model'].predict(scale_inputs(artifacts['scaler'], X))
+        base_prediction = predictions[0]
+        current_outcome = {
+            'x': float(base_prediction[1]),
+            'y': float(base_prediction[0])
+        }
+        scenarios = {key: [] for key in variable_ranges}
+        for (key, value), prediction in zip(scenario_keys, predictions[1:]):
+            scenarios[key].append({
+                'x': float(prediction[1]),
+                'y': float(prediction[0]),
+                'value': value
+            })
         recommendations = []
         study_time = base_inputs.get('studytime', 2)
         go_out_time = base_inputs.get('goout', 3)
@@ -115,11 +156,55 @@ def create_app_and_model():
                 recommendations.append(f"Your social sentiment score is {social_sentiment:.2f}, showing a generally positive outlook. Continue to maintain healthy social interactions and support networks.")
             else:
                 recommendations.append(f"Your social sentiment score is {social_sentiment:.2f}, which is neutral. If you feel you need more support, don't hesitate to connect with others or try new social activities.")
-        return jsonify({
+        return {
             'current_outcome': current_outcome,
             'scenarios': scenarios,
             'recommendations': recommendations
-        })
+        }
+
+    @app.route('/analyze-lifestyle', methods=['POST'])
+    @profile_requests('request_analyze_lifestyle')
+    def analyze_lifestyle():
+        artifacts = state['artifacts']
+        if not artifacts: return model_unavailable()
+        data = request.get_json()
+        base_inputs = data['base_inputs']
+        entry = response_cache.get_or_build(artifacts['model_version'], 'analyze-lifestyle', base_inputs, lambda: build_analysis(artifacts, base_inputs))
+        return conditional_response(entry, request)
+
+    @app.route('/optimal-lifestyle', methods=['POST'])
+    def optimal_lifestyle():
+        artifacts = state['artifacts']
+        if not artifacts: return model_unavailable()
+        from lifestyle_search import search_minimal_changes, validate_search_options
+        data = request.get_json()
+        try:
+            targets, costs, top_k = validate_search_options(data.get('targets'), data.get('costs'), data.get('top_k', 5))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        build = lambda: search_minimal_changes(
+            artifacts['model'], artifacts['scaler'], artifacts['model_columns'],
+            base_inputs=data['base_inputs'],
+            targets=targets,
+            costs=costs,
+            top_k=top_k
+        )
+        entry = response_cache.get_or_build(artifacts['model_version'], 'optimal-lifestyle', data, build)
+        return conditional_response(entry, request)
+
+    @app.route('/population-whatif')
+    def population_whatif():
+        # Precomputed at training time, so this never touches the model.
+        artifacts = state['artifacts']
+        if not artifacts: return model_unavailable()
+        if not artifacts['whatif_tables']: return jsonify({'error': 'What-if tables not available for this model version.'})
+        build = lambda: {'feature_importances': artifacts['feature_importances'], **artifacts['whatif_tables']}
+        entry = response_cache.get_or_build(artifacts['model_version'], 'population-whatif', None, build)
+        return conditional_response(entry, request)
+
+    @app.route('/cache-stats')
+    def cache_stats():
+        return jsonify(response_cache.stats())
 
     @app.route('/spark-demo')
     def spark_demo():
@@ -308,14 +393,16 @@ HTML_TEMPLATE = """
 
 if __name__ == '__main__':
     import sys
-    import multiprocessing
     import subprocess
     import threading
     import time
-    multiprocessing.freeze_support()
-    if len(sys.argv) > 1 and sys.argv[1] == '--with-fake-scraper':
-        flask_proc = multiprocessing.Process(target=run_flask)
-        flask_proc.start()
+    if '--profile' in sys.argv:
+        from profiling import enable
+        enable()
+    # Start listening at once and load the model behind the /ready gate.
+    background_load = '--background-load' in sys.argv
+    if '--with-fake-scraper' in sys.argv[1:]:
+        # Flask stays in this process; only the scraper gets its own.
         scraper_proc = subprocess.Popen([sys.executable, 'real_twitter_scraper_disabled.py'])
         def scraper_status_watcher(proc):
             while proc.poll() is None:
@@ -324,10 +411,12 @@ if __name__ == '__main__':
             print('Scraper has stopped.')
         status_thread = threading.Thread(target=scraper_status_watcher, args=(scraper_proc,), daemon=True)
         status_thread.start()
-        flask_proc.join()
-        if scraper_proc.poll() is None:
-            print('Flask app exited. Terminating scraper...')
-            scraper_proc.terminate()
-        status_thread.join(timeout=1)
+        try:
+            run_flask(background_load)
+        finally:
+            if scraper_proc.poll() is None:
+                print('Flask app exited. Terminating scraper...')
+                scraper_proc.terminate()
+            status_thread.join(timeout=1)
     else:
-        run_flask()
+        run_flask(background_load)
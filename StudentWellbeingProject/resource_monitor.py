@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+resource_monitor.py - Process Memory Measurement
+
+Reports resident set size (RSS) per pipeline stage. A background thread
+samples the current RSS while a stage runs so each stage gets its own peak;
+without psutil it falls back to the process-lifetime high-water mark.
+"""
+import sys
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def current_rss():
+    """Current RSS in bytes, or None if it cannot be measured."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    return None
+
+def lifetime_peak_rss():
+    """Highest RSS the process has reached so far, in bytes."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss)
+    return None
+
+@contextmanager
+def track_peak_rss(stage, report, interval=0.05):
+    """
+    Records {'stage', 'seconds', 'rss_bytes', 'peak_rss_bytes'} for the wrapped
+    block and appends it to `report`.
+    """
+    samples = []
+    stop = threading.Event()
+
+    def sample():
+        while not stop.is_set():
+            samples.append(current_rss())
+            stop.wait(interval)
+
+    sampler = None
+    if psutil is not None:
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        if sampler is not None:
+            stop.set()
+            sampler.join()
+            samples.append(current_rss())
+            peak = max(samples)
+        else:
+            peak = lifetime_peak_rss()
+        entry = {'stage': stage, 'seconds': seconds, 'rss_bytes': current_rss(), 'peak_rss_bytes': peak}
+        report.append(entry)
+        peak_text = f"{peak / 2**20:.1f} MiB" if peak is not None else "n/a"
+        print(f" [memory] {stage}: peak RSS {peak_text} ({seconds:.2f}s)")
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+response_cache.py - HTTP Response Cache for Deterministic Endpoints
+
+For a given model version, prediction responses are pure functions of their
+JSON inputs. Serialized bodies are kept in a size-bounded LRU keyed by
+(model version, route, canonicalized inputs), with an ETag so repeat clients
+get a 304, and a pre-compressed gzip copy of large bodies. The whole cache is
+dropped as soon as the loaded model version changes.
+"""
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import Response
+
+GZIP_MIN_BYTES = 1024
+
+def _canonical(value):
+    """
+    Normalizes containers so equivalent payloads share a key. Numbers are kept
+    as sent: responses echo raw inputs (e.g. "5.0 units/week"), so 5 and 5.0
+    must not share a cached body.
+    """
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+def make_entry(body, content_type='application/json'):
+    """Serialized response: body, optional gzip copy, and a strong ETag."""
+    return {
+        'body': body,
+        'gzip': gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None,
+        'etag': '"' + hashlib.sha256(body).hexdigest()[:32] + '"',
+        'content_type': content_type
+    }
+
+def _entry_size(entry):
+    return len(entry['body']) + len(entry['gzip'] or b'')
+
+def conditional_response(entry, request, cache_control='no-cache'):
+    """Builds a Flask response for `entry`, honouring If-None-Match and Accept-Encoding."""
+    headers = {'ETag': entry['etag'], 'Cache-Control': cache_control, 'Vary': 'Accept-Encoding'}
+    if entry['etag'] in request.headers.get('If-None-Match', '') or request.headers.get('If-None-Match') == '*':
+        return Response(status=304, headers=headers)
+    if entry['gzip'] is not None and 'gzip' in request.headers.get('Accept-Encoding', ''):
+        headers['Content-Encoding'] = 'gzip'
+        return Response(entry['gzip'], content_type=entry['content_type'], headers=headers)
+    return Response(entry['body'], content_type=entry['content_type'], headers=headers)
+
+class ResponseCache:
+    """Thread-safe LRU of serialized responses, evicting once `max_bytes` is exceeded."""
+
+    def __init__(self, max_bytes=32 * 2**20):
+        self.max_bytes = max_bytes
+        self.model_version = None
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    @staticmethod
+    def make_key(model_version, route, payload):
+        canonical = json.dumps([model_version, route, _canonical(payload)], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def ensure_version(self, model_version):
+        """Drops every entry if the serving model version has changed."""
+        with self._lock:
+            if model_version == self.model_version: return
+            if self._entries: self._stats['invalidations'] += 1
+            self._entries.clear()
+            self._bytes = 0
+            self.model_version = model_version
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry
+
+    def put(self, key, entry):
+        size = _entry_size(entry)
+        if size > self.max_bytes: return entry
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= _entry_size(self._entries.pop(key))
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= _entry_size(evicted)
+                self._stats['evictions'] += 1
+        return entry
+
+    def get_or_build(self, model_version, route, payload, build):
+        """Returns the cached entry for these inputs, building the JSON body on a miss."""
+        self.ensure_version(model_version)
+        key = self.make_key(model_version, route, payload)
+        entry = self.get(key)
+        if entry is None:
+            entry = self.put(key, make_entry(json.dumps(build()).encode('utf-8')))
+        return entry
+
+    def stats(self):
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                **self._stats,
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'model_version': self.model_version
+            }
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+sentiment_service.py - Shared, Cached Sentiment Scoring
+
+The one place sentiment is computed for the training pipeline, the scraped
+data analysis and the fake scraper. Records are routed to an analyzer by
+their `lang` (languages without an analyzer score None), scored in batches,
+and cached by a content hash in a persistent SQLite store with LRU eviction.
+Identical texts, such as retweets, are scored only once across all runs.
+
+Environment variables:
+    WELLBEING_SENTIMENT_CACHE        cache file (default: ~/StudentWellbeingProjectModels/sentiment_cache.sqlite3)
+    WELLBEING_SENTIMENT_CACHE_SIZE   max cached texts before LRU eviction (default: 200000)
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path.home() / "StudentWellbeingProjectModels" / "sentiment_cache.sqlite3"
+DEFAULT_MAX_ENTRIES = 200_000
+
+# Language -> analyzer. VADER is English-only, so other languages score None.
+LANGUAGE_ROUTES = {'en': 'vader'}
+# Records without a `lang` field are treated as English, as the pipeline always did.
+DEFAULT_LANG = 'en'
+
+# SECTION 1: ANALYZER BACKENDS
+# ==============================================================================
+def _vader_batch():
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    analyzer = SentimentIntensityAnalyzer()
+    return lambda texts: [analyzer.polarity_scores(t)['compound'] for t in texts]
+
+BACKENDS = {'vader': _vader_batch}
+
+# SECTION 2: SERVICE
+# ==============================================================================
+class SentimentService:
+    """Batch sentiment scorer backed by a persistent, size-bounded LRU cache."""
+
+    def __init__(self, cache_path=None, max_entries=None, routes=None, batch_size=512):
+        self.cache_path = Path(cache_path or os.environ.get('WELLBEING_SENTIMENT_CACHE', DEFAULT_CACHE_PATH))
+        self.max_entries = int(max_entries or os.environ.get('WELLBEING_SENTIMENT_CACHE_SIZE', DEFAULT_MAX_ENTRIES))
+        self.routes = routes or LANGUAGE_ROUTES
+        self.batch_size = batch_size
+        self.stats = {'hits': 0, 'misses': 0, 'unrouted': 0, 'evictions': 0}
+        self._analyzers = {}
+        self._lock = threading.Lock()
+        self._db = self._open_cache()
+        self._entries = self._db.execute('SELECT COUNT(*) FROM sentiment').fetchone()[0]
+
+    def _open_cache(self):
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+            db.execute('PRAGMA journal_mode=WAL')
+        except (OSError, sqlite3.Error) as e:
+            print(f"WARNING: sentiment cache unavailable at {self.cache_path} ({e}); using an in-memory cache.")
+            db = sqlite3.connect(':memory:', check_same_thread=False)
+        db.execute('CREATE TABLE IF NOT EXISTS sentiment (key TEXT PRIMARY KEY, score REAL NOT NULL, last_used REAL NOT NULL)')
+        db.execute('CREATE INDEX IF NOT EXISTS sentiment_last_used ON sentiment (last_used)')
+        return db
+
+    def _analyzer(self, backend):
+        if backend not in self._analyzers:
+            self._analyzers[backend] = BACKENDS[backend]()
+        return self._analyzers[backend]
+
+    @staticmethod
+    def _score_batch(score_batch, texts):
+        """Scores a batch; if it fails, retries text by text so one bad text only costs itself."""
+        try:
+            return score_batch(texts)
+        except Exception:
+            scores = []
+            for text in texts:
+                try: scores.append(score_batch([text])[0])
+                except Exception: scores.append(None)
+            return scores
+
+    @staticmethod
+    def _key(backend, text):
+        return hashlib.sha256(f"{backend}\0{text}".encode('utf-8')).hexdigest()
+
+    def _lookup(self, keys):
+        found = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            found.update(self._db.execute(f'SELECT key, score FROM sentiment WHERE key IN ({placeholders})', chunk))
+        return found
+
+    def _evict(self):
+        if self._entries <= self.max_entries: return
+        # Other processes may share the cache file, so recount before evicting.
+        self._entries = self._db.execute('SELECT COUNT(*) FROM sentiment').fetchone()[0]
+        overflow = self._entries - self.max_entries
+        if overflow <= 0: return
+        self._db.execute('DELETE FROM sentiment WHERE key IN (SELECT key FROM sentiment ORDER BY last_used LIMIT ?)', (overflow,))
+        self._entries -= overflow
+        self.stats['evictions'] += overflow
+
+    def score_texts(self, texts, langs=None):
+        """Scores `texts` (with matching `langs`); unrouted languages and empty texts get None."""
+        langs = langs if langs is not None else [None] * len(texts)
+        results = [None] * len(texts)
+        pending = {}  # cache key -> (backend, text, [positions])
+        for i, (text, lang) in enumerate(zip(texts, langs)):
+            backend = self.routes.get(lang if isinstance(lang, str) and lang else DEFAULT_LANG)
+            if backend is None or not isinstance(text, str) or not text:
+                self.stats['unrouted'] += 1
+                continue
+            key = self._key(backend, text)
+            pending.setdefault(key, (backend, text, []))[2].append(i)
+        if not pending: return results
+
+        with self._lock:
+            now = time.time()
+            cached = self._lookup(list(pending))
+            self.stats['hits'] += len(cached)
+            self.stats['misses'] += len(pending) - len(cached)
+            scores = dict(cached)
+
+            misses = {}
+            for key, (backend, text, _) in pending.items():
+                if key not in cached: misses.setdefault(backend, []).append((key, text))
+            new_rows = []
+            for backend, items in misses.items():
+                score_batch = self._analyzer(backend)
+                for start in range(0, len(items), self.batch_size):
+                    batch = items[start:start + self.batch_size]
+                    for (key, _), score in zip(batch, self._score_batch(score_batch, [text for _, text in batch])):
+                        scores[key] = score
+                        if score is not None: new_rows.append((key, score, now))
+
+            with self._db:
+                self._db.executemany('UPDATE sentiment SET last_used = ? WHERE key = ?', [(now, key) for key in cached])
+                self._db.executemany('INSERT OR REPLACE INTO sentiment (key, score, last_used) VALUES (?, ?, ?)', new_rows)
+                self._entries += len(new_rows)
+                self._evict()
+
+        for key, (_, _, positions) in pending.items():
+            for i in positions: results[i] = scores[key]
+        return results
+
+    def score_records(self, records, text_key='text', lang_key='lang'):
+        """Scores a list of scraped-record dicts; returns one score (or None) per record."""
+        return self.score_texts([r.get(text_key) for r in records], [r.get(lang_key) for r in records])
+
+    def close(self):
+        with self._lock: self._db.close()
+
+_service = None
+
+def get_service():
+    """Process-wide shared service, opened on first use."""
+    global _service
+    if _service is None: _service = SentimentService()
+    return _service
+
+def score_texts(texts, langs=None):
+    return get_service().score_texts(texts, langs)
+
+def score_records(records, text_key='text', lang_key='lang'):
+    return get_service().score_records(records, text_key, lang_key)
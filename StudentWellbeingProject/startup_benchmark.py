@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+startup_benchmark.py - Cold-Start Budget Check for the Web App
+
+Starts a fresh interpreter with `-X importtime`, imports `recommendation_app`
+and builds the app, then reports:
+  - time until the app can accept requests (what a replica's startup probe sees)
+  - time until `/ready` turns 200 (model artifacts loaded)
+  - import time per top-level package, so new heavy imports are easy to spot
+Both eager and `--background-load` startup are measured. With `--budget-ms`
+the script exits non-zero when time-to-listen is over budget.
+
+To run: `python startup_benchmark.py [--budget-ms 1500] [--output startup_report.json]`
+"""
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+from collections import defaultdict
+
+# Runs inside the measured interpreter; prints one JSON line of timings.
+PROBE = r"""
+import json, time
+t0 = time.perf_counter()
+import recommendation_app
+t_import = time.perf_counter()
+app = recommendation_app.create_app_and_model(background_load={background_load})
+t_app = time.perf_counter()
+client = app.test_client()
+while client.get('/ready').get_json()['loading']:
+    time.sleep(0.005)
+t_ready = time.perf_counter()
+print('STARTUP_RESULT ' + json.dumps({{
+    'import_app_ms': (t_import - t0) * 1000,
+    'time_to_listen_ms': (t_app - t0) * 1000,
+    'time_to_ready_ms': (t_ready - t0) * 1000,
+    'model_loaded': client.get('/ready').status_code == 200
+}}))
+"""
+
+def parse_importtime(stderr):
+    """Sums `-X importtime` self time (ms) per top-level package."""
+    per_package = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line: continue
+        try:
+            self_us, _, module = line[len('import time:'):].split('|')
+        except ValueError:
+            continue
+        per_package[module.strip().split('.')[0]] += int(self_us) / 1000
+    return dict(sorted(per_package.items(), key=lambda item: item[1], reverse=True))
+
+def measure_startup(background_load):
+    code = PROBE.format(background_load=background_load)
+    # Run next to recommendation_app.py, whatever directory the script was started from.
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True,
+                          cwd=Path(__file__).resolve().parent)
+    result_lines = [line for line in proc.stdout.splitlines() if line.startswith('STARTUP_RESULT ')]
+    if proc.returncode != 0 or not result_lines:
+        raise RuntimeError(f"Startup probe failed:\n{proc.stderr[-2000:]}")
+    result = json.loads(result_lines[-1][len('STARTUP_RESULT '):])
+    result['mode'] = 'background' if background_load else 'eager'
+    result['imports_ms'] = parse_importtime(proc.stderr)
+    return result
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure web app cold start.')
+    parser.add_argument('--budget-ms', type=float, help='Fail if time-to-listen exceeds this (background mode).')
+    parser.add_argument('--top', type=int, default=10, help='Packages to list in the import breakdown.')
+    parser.add_argument('--output', help='Optional JSON report path.')
+    args = parser.parse_args()
+
+    results = [measure_startup(False), measure_startup(True)]
+    for result in results:
+        print(f"\n--- {result['mode'].upper()} startup ---")
+        print(f"import recommendation_app: {result['import_app_ms']:8.1f} ms")
+        print(f"time to listen:            {result['time_to_listen_ms']:8.1f} ms")
+        print(f"time to ready:             {result['time_to_ready_ms']:8.1f} ms (model loaded: {result['model_loaded']})")
+        print("Import time by package:")
+        for package, ms in list(result['imports_ms'].items())[:args.top]:
+            print(f"  {package:<24}{ms:8.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f: json.dump(results, f, indent=4)
+        print(f"\nReport written to {args.output}")
+
+    if args.budget_ms is not None:
+        listen_ms = results[1]['time_to_listen_ms']
+        within = listen_ms <= args.budget_ms
+        print(f"\nStartup budget: {listen_ms:.1f} ms / {args.budget_ms:.1f} ms -> {'OK' if within else 'OVER BUDGET'}")
+        sys.exit(0 if within else 1)
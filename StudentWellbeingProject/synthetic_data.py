@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+"""
+synthetic_data.py - Offline Synthetic Dataset Generator
+
+Writes synthetic stand-ins for the three Kaggle datasets and the scraped
+JSONL corpus, using the same file names, schemas and directory layout as the
+real downloads, so `training_pipeline.py` can run without network access.
+Student rows are generated and written in chunks, so 10M-row files never
+need to fit in memory.
+
+To run: `python synthetic_data.py --rows 100000 --out synthetic_data`
+"""
+import json
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Column domains of the UCI student-mat.csv file, in file order.
+STUDENT_CATEGORICAL = {
+    'school': ['GP', 'MS'], 'sex': ['F', 'M'], 'address': ['U', 'R'], 'famsize': ['GT3', 'LE3'],
+    'Pstatus': ['T', 'A'], 'Mjob': ['at_home', 'health', 'other', 'services', 'teacher'],
+    'Fjob': ['at_home', 'health', 'other', 'services', 'teacher'],
+    'reason': ['course', 'home', 'other', 'reputation'], 'guardian': ['mother', 'father', 'other']
+}
+STUDENT_BINARY = ['schoolsup', 'famsup', 'paid', 'activities', 'nursery', 'higher', 'internet', 'romantic']
+STUDENT_COLUMNS = [
+    'school', 'sex', 'age', 'address', 'famsize', 'Pstatus', 'Medu', 'Fedu', 'Mjob', 'Fjob', 'reason',
+    'guardian', 'traveltime', 'studytime', 'failures', 'schoolsup', 'famsup', 'paid', 'activities',
+    'nursery', 'higher', 'internet', 'romantic', 'famrel', 'freetime', 'goout', 'Dalc', 'Walc',
+    'health', 'absences', 'G1', 'G2', 'G3'
+]
+
+DRUG_USE_AGES = ['12', '13', '14', '15', '16', '17', '18', '19', '20', '21',
+                 '22-23', '24-25', '26-29', '30-34', '35-49', '50-64', '65+']
+DRUG_USE_SUBSTANCES = ['alcohol', 'marijuana', 'cocaine', 'crack', 'heroin', 'hallucinogen', 'inhalant',
+                       'pain-releiver', 'oxycontin', 'tranquilizer', 'stimulant', 'meth', 'sedative']
+
+# Raw headers of "Life Expectancy Data.csv", including the original stray spaces.
+LIFE_EXPECTANCY_COLUMNS = [
+    'Country', 'Year', 'Status', 'Life expectancy ', 'Adult Mortality', 'infant deaths', 'Alcohol',
+    'percentage expenditure', 'Hepatitis B', 'Measles ', ' BMI ', 'under-five deaths ', 'Polio',
+    'Total expenditure', 'Diphtheria ', ' HIV/AIDS', 'GDP', 'Population', ' thinness  1-19 years',
+    ' thinness 5-9 years', 'Income composition of resources', 'Schooling'
+]
+
+SCRAPED_LANGUAGES = ['en', 'id', 'ms', 'ja', 'ko', 'zh']
+SCRAPED_PHRASES = {
+    'en': ['exam anxiety is killing me', 'college life is great this week', 'so much student stress right now',
+           'university burnout is real', 'finally finished my assignment, feeling good', 'no sleep before the final'],
+    'id': ['tugas kuliah banyak sekali', 'stress akademik minggu ini'],
+    'ms': ['tekanan peperiksaan semakin tinggi', 'kehidupan universiti sangat sibuk'],
+    'ja': ['試験のストレスがすごい', '大学生活は楽しい'],
+    'ko': ['시험 스트레스가 심해요', '대학 생활이 바빠요'],
+    'zh': ['考試壓力很大', '大學生活很忙']
+}
+
+# SECTION 1: KAGGLE DATASET STAND-INS
+# ==============================================================================
+def _student_chunk(rng, n_rows):
+    chunk = {}
+    for col in STUDENT_COLUMNS:
+        if col in STUDENT_CATEGORICAL:
+            chunk[col] = rng.choice(STUDENT_CATEGORICAL[col], n_rows)
+        elif col in STUDENT_BINARY:
+            chunk[col] = rng.choice(['yes', 'no'], n_rows)
+    chunk['age'] = rng.integers(15, 23, n_rows)
+    chunk['Medu'] = rng.integers(0, 5, n_rows)
+    chunk['Fedu'] = rng.integers(0, 5, n_rows)
+    chunk['traveltime'] = rng.integers(1, 5, n_rows)
+    chunk['studytime'] = rng.integers(1, 5, n_rows)
+    chunk['failures'] = rng.choice([0, 1, 2, 3], n_rows, p=[0.79, 0.13, 0.04, 0.04])
+    chunk['famrel'] = rng.integers(1, 6, n_rows)
+    chunk['freetime'] = rng.integers(1, 6, n_rows)
+    chunk['goout'] = rng.integers(1, 6, n_rows)
+    chunk['Dalc'] = np.clip(rng.poisson(0.5, n_rows) + 1, 1, 5)
+    chunk['Walc'] = np.clip(chunk['Dalc'] + rng.integers(-1, 3, n_rows), 1, 5)
+    alcohol = chunk['Dalc'] + chunk['Walc']
+    chunk['health'] = np.clip(np.rint(4 - 0.15 * alcohol + rng.normal(0, 1.2, n_rows)), 1, 5).astype(int)
+    chunk['absences'] = np.clip(rng.poisson(5, n_rows) + alcohol // 3, 0, 93)
+    # Grades loosely follow the real data: study helps, failures and drinking hurt.
+    grade = 10 + 0.8 * chunk['studytime'] - 1.8 * chunk['failures'] - 0.3 * alcohol + 0.2 * (3 - chunk['goout'])
+    chunk['G3'] = np.clip(np.rint(grade + rng.normal(0, 3, n_rows)), 0, 20).astype(int)
+    chunk['G2'] = np.clip(chunk['G3'] + rng.integers(-2, 3, n_rows), 0, 20)
+    chunk['G1'] = np.clip(chunk['G2'] + rng.integers(-2, 3, n_rows), 0, 20)
+    return pd.DataFrame(chunk, columns=STUDENT_COLUMNS)
+
+def generate_student_csv(path, n_rows, seed=42, chunksize=250_000):
+    """Writes a semicolon-delimited `student-mat.csv` with `n_rows` rows."""
+    rng = np.random.default_rng(seed)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        while written < n_rows:
+            chunk = _student_chunk(rng, min(chunksize, n_rows - written))
+            chunk.to_csv(f, sep=';', index=False, header=written == 0)
+            written += len(chunk)
+    return path
+
+def generate_drug_use_csv(path, seed=42):
+    """Writes `drug-use-by-age.csv` (one row per age band, use % and frequency per substance)."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({'age': DRUG_USE_AGES, 'n': rng.integers(2000, 8000, len(DRUG_USE_AGES))})
+    for substance in DRUG_USE_SUBSTANCES:
+        df[f'{substance}-use'] = rng.uniform(0, 80 if substance == 'alcohol' else 15, len(df)).round(1)
+        df[f'{substance}-frequency'] = rng.uniform(1, 52, len(df)).round(1)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, index=False)
+    return path
+
+def generate_life_expectancy_csv(path, n_rows=2938, seed=42):
+    """Writes `Life Expectancy Data.csv` with the WHO dataset's raw headers."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({col: rng.uniform(0, 100, n_rows).round(2) for col in LIFE_EXPECTANCY_COLUMNS})
+    df['Country'] = [f'Country {i % 193}' for i in range(n_rows)]
+    df['Year'] = 2000 + np.arange(n_rows) % 16
+    df['Status'] = rng.choice(['Developing', 'Developed'], n_rows, p=[0.83, 0.17])
+    df['Life expectancy '] = rng.normal(69, 9.5, n_rows).round(1)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, index=False)
+    return path
+
+# SECTION 2: SCRAPED CORPUS
+# ==============================================================================
+def generate_scraped_jsonl(path, n_records, duplicate_fraction=0.3, seed=42):
+    """
+    Writes a scraped-data JSONL corpus in the fake-scraper record format. About
+    `duplicate_fraction` of the records reuse an earlier text, as retweets do.
+    """
+    rng = np.random.default_rng(seed)
+    start = datetime(2025, 1, 1)
+    texts = []
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(n_records):
+            lang = SCRAPED_LANGUAGES[rng.integers(len(SCRAPED_LANGUAGES))]
+            if texts and rng.random() < duplicate_fraction:
+                lang, text = texts[rng.integers(len(texts))]
+            else:
+                phrases = SCRAPED_PHRASES[lang]
+                text = f"{phrases[rng.integers(len(phrases))]} #{i}"
+                texts.append((lang, text))
+            record = {
+                'source': 'twitter_synthetic',
+                'id': f'synthetic_{i}',
+                'timestamp': (start + timedelta(minutes=int(i))).isoformat(),
+                'text': text,
+                'user': f'user_{rng.integers(10_000)}',
+                'lang': lang,
+                'veracity': 0
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return path
+
+# SECTION 3: FULL DATASET LAYOUT
+# ==============================================================================
+def generate_datasets(out_dir, n_rows, n_scraped=1000, seed=42):
+    """
+    Generates every input under `out_dir` and returns the paths in the form
+    `load_and_enrich_data(dataset_paths=...)` expects, plus 'scraped' for
+    `load_scraped_data`.
+    """
+    out_dir = Path(out_dir)
+    generate_student_csv(out_dir / 'student_alcohol' / 'student-mat.csv', n_rows, seed=seed)
+    generate_drug_use_csv(out_dir / 'drug_use' / 'drug-use-by-age.csv', seed=seed)
+    generate_life_expectancy_csv(out_dir / 'life_expectancy' / 'Life Expectancy Data.csv', seed=seed)
+    generate_scraped_jsonl(out_dir / 'scraped_data.jsonl', n_scraped, seed=seed)
+    return {
+        'student_alcohol': str(out_dir / 'student_alcohol'),
+        'drug_use': str(out_dir / 'drug_use'),
+        'life_expectancy': str(out_dir / 'life_expectancy'),
+        'scraped': str(out_dir / 'scraped_data.jsonl')
+    }
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate synthetic training inputs.')
+    parser.add_argument('--rows', type=int, default=1000, help='Student rows to generate (1k to 10M).')
+    parser.add_argument('--scraped', type=int, default=1000, help='Scraped JSONL records to generate.')
+    parser.add_argument('--out', default='synthetic_data', help='Output directory.')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    paths = generate_datasets(args.out, args.rows, args.scraped, args.seed)
+    print(f"Synthetic datasets written to {Path(args.out).resolve()}:")
+    for name, path in paths.items():
+        print(f" -> {name}: {path}")
@@ -12,40 +12,70 @@ import json
 import joblib
 from pathlib import Path
 import sys
+import argparse
 
-from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_squared_error
 
-import kagglehub
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from model_evaluation import HoldoutMismatchError, load_or_create_holdout, load_or_create_holdout_rows, holdout_matrix, score_on_holdout, measure_inference, save_evaluation
+from resource_monitor import track_peak_rss
+from sentiment_service import score_texts
+from profiling import stage, enable as enable_profiling
+
 
 # SECTION 2: DATA LOADING AND ENRICHMENT
 # ==============================================================================
-def load_and_enrich_data():
+def download_datasets():
+    """Downloads the Kaggle datasets and returns {name: local directory or None}."""
+    import kagglehub  # only needed online; offline runs pass local dataset paths
+    datasets_to_load = { 'student_alcohol': 'uciml/student-alcohol-consumption', 'drug_use': 'tunguz/drug-use-by-age', 'life_expectancy': 'kumarajarshi/life-expectancy-who' }
+    downloaded_paths = {}
+    with stage('download'):
+        for name, handle in datasets_to_load.items():
+            try:
+                downloaded_paths[name] = kagglehub.dataset_download(handle)
+            except Exception as e:
+                print(f" -> FAILED to download {name}. Skipping.")
+                downloaded_paths[name] = None
+    return downloaded_paths
+
+def detect_delimiter(csv_path):
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        first_line = f.readline()
+    return ';' if first_line.count(';') > first_line.count(',') else ','
+
+def load_context_features(downloaded_paths):
+    """Population-level context values that are broadcast onto every student row."""
+    context = {}
+    if downloaded_paths.get('drug_use'):
+        drug_use_path = os.path.join(downloaded_paths['drug_use'], "drug-use-by-age.csv")
+        df_drug = pd.read_csv(drug_use_path)
+        df_drug.columns = [col.strip().lower() for col in df_drug.columns]
+        drug_use_subset = df_drug[df_drug['age'] == '17'] 
+        if not drug_use_subset.empty: context['context_alcohol_use_rate_17'] = drug_use_subset['alcohol-use'].iloc[0]
+
+    if downloaded_paths.get('life_expectancy'):
+        life_exp_path = os.path.join(downloaded_paths['life_expectancy'], "Life Expectancy Data.csv")
+        df_life = pd.read_csv(life_exp_path)
+        df_life.columns = [col.strip().lower() for col in df_life.columns]
+        context['context_avg_life_expectancy'] = df_life['life expectancy'].mean()
+    return context
+
+def load_and_enrich_data(dataset_paths=None):
     """
     Downloads, loads, and merges multiple Kaggle datasets to create an enriched
-    feature set for training.
+    feature set for training. `dataset_paths` ({name: directory}, same layout
+    as the Kaggle downloads) skips the download, e.g. for synthetic data.
     """
     print("--- Starting Multi-Dataset Enrichment Process ---")
-    datasets_to_load = { 'student_alcohol': 'uciml/student-alcohol-consumption', 'drug_use': 'tunguz/drug-use-by-age', 'life_expectancy': 'kumarajarshi/life-expectancy-who' }
-    downloaded_paths = {}
-    for name, handle in datasets_to_load.items():
-        try:
-            downloaded_paths[name] = kagglehub.dataset_download(handle)
-        except Exception as e:
-            print(f" -> FAILED to download {name}. Skipping.")
-            downloaded_paths[name] = None
+    downloaded_paths = dataset_paths if dataset_paths is not None else download_datasets()
             
     if not downloaded_paths.get('student_alcohol'): return None
     primary_df_path = os.path.join(downloaded_paths['student_alcohol'], "student-mat.csv")
     
     try:
-        with open(primary_df_path, 'r', encoding='utf-8') as f:
-            first_line = f.readline()
-            delimiter = ';' if first_line.count(';') > first_line.count(',') else ','
-        df_main = pd.read_csv(primary_df_path, sep=delimiter)
+        with stage('csv_parse'):
+            df_main = pd.read_csv(primary_df_path, sep=detect_delimiter(primary_df_path))
     except Exception as e:
         print(f"Failed to read the primary CSV file. Error: {e}")
         return None
@@ -55,18 +85,9 @@ def load_and_enrich_data():
     
     print(f"\nLoaded primary dataset with {len(df_main)} records.")
     
-    if downloaded_paths.get('drug_use'):
-        drug_use_path = os.path.join(downloaded_paths['drug_use'], "drug-use-by-age.csv")
-        df_drug = pd.read_csv(drug_use_path)
-        df_drug.columns = [col.strip().lower() for col in df_drug.columns]
-        drug_use_subset = df_drug[df_drug['age'] == '17'] 
-        if not drug_use_subset.empty: df_main['context_alcohol_use_rate_17'] = drug_use_subset['alcohol-use'].iloc[0]
-
-    if downloaded_paths.get('life_expectancy'):
-        life_exp_path = os.path.join(downloaded_paths['life_expectancy'], "Life Expectancy Data.csv")
-        df_life = pd.read_csv(life_exp_path)
-        df_life.columns = [col.strip().lower() for col in df_life.columns]
-        df_main['context_avg_life_expectancy'] = df_life['life expectancy'].mean()
+    with stage('enrichment'):
+        for name, value in load_context_features(downloaded_paths).items():
+            df_main[name] = value
         
     print("\n--- Feature Enrichment Complete ---")
     return df_main
@@ -77,97 +98,389 @@ def load_scraped_data(file_path='scraped_data.jsonl'):
         df = pd.read_json(file_path, lines=True)
         df.dropna(subset=['text'], inplace=True)
         if df.empty: return 0.0, 1.0
-        analyzer = SentimentIntensityAnalyzer()
-        df['sentiment'] = df['text'].apply(lambda t: analyzer.polarity_scores(t)['compound'])
+        with stage('sentiment'):
+            langs = df['lang'].tolist() if 'lang' in df.columns else None
+            df['sentiment'] = pd.Series(score_texts(df['text'].tolist(), langs), index=df.index, dtype=float)
         # Calculate average veracity if present, else default to 1.0
         avg_veracity = df['veracity'].mean() if 'veracity' in df.columns else 1.0
-        return df['sentiment'].mean(), avg_veracity
+        # Only records in a language with a sentiment analyzer count towards the mean.
+        avg_sentiment = df['sentiment'].mean() if df['sentiment'].notna().any() else 0.0
+        return avg_sentiment, avg_veracity
     except Exception:
         return 0.0, 1.0
 
-# SECTION 3: MODEL TRAINING
+# SECTION 3: POPULATION WHAT-IF TABLES
 # ==============================================================================
-def train_and_save_model(df, sentiment_score, veracity_score):
+# Lifestyle values swept for the partial-dependence curves. These mirror the
+# slider ranges of the web app so dashboards and the planner stay comparable.
+WHATIF_GRID = {
+    'studytime': [1, 2, 3, 4],
+    'goout': [1, 2, 3, 4, 5],
+    'total_alcohol': [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
+    'failures': [0, 1, 2, 3, 4]
+}
+WHATIF_INTERACTIONS = [('studytime', 'total_alcohol'), ('goout', 'total_alcohol')]
+
+def _batched_mean_predictions(model, X_base, assignments, max_batch_rows=250_000):
     """
-    Trains a RandomForest model and saves all necessary artifacts, including
-    the crucial feature importances.
+    Averages the model's predictions over every row of `X_base` for each
+    assignment ({column_index: scaled_value}). Assignments are stacked into
+    as few `predict` calls as `max_batch_rows` allows.
     """
-    print("\n--- Starting Model Training Process ---")
-    
+    n_rows = X_base.shape[0]
+    per_batch = max(1, max_batch_rows // n_rows)
+    means = []
+    for start in range(0, len(assignments), per_batch):
+        chunk = assignments[start:start + per_batch]
+        batch = np.tile(X_base, (len(chunk), 1))
+        for i, assignment in enumerate(chunk):
+            for col_idx, value in assignment.items():
+                batch[i * n_rows:(i + 1) * n_rows, col_idx] = value
+        preds = np.asarray(model.predict(batch)).reshape(len(chunk), n_rows, -1)
+        means.extend(preds.mean(axis=1))
+    return np.asarray(means)
+
+def compute_whatif_tables(model, scaler, X_train, feature_names, max_rows=5000, random_state=42):
+    """
+    Computes population-level partial-dependence curves, pairwise interaction
+    grids and a per-feature sensitivity summary for grade (g3) and health.
+    `X_train` is the scaled training matrix; grid values are mapped into the
+    scaler's space so no unscaled copy of the data is needed.
+
+    Averages are taken over at most `max_rows` training rows: larger training
+    sets are sampled uniformly without replacement (seeded by `random_state`),
+    which keeps the sweep's cost flat as the data grows. The saved table
+    records `n_rows` (rows averaged over), `n_training_rows` and `sampled`.
+    """
+    feature_names = list(feature_names)
+    X_base = np.asarray(X_train, dtype=np.float32)
+    n_training_rows = len(X_base)
+    if n_training_rows > max_rows:
+        rng = np.random.default_rng(random_state)
+        X_base = X_base[rng.choice(len(X_base), size=max_rows, replace=False)]
+
+    def scaled(feature, value):
+        idx = feature_names.index(feature)
+        return idx, (value - scaler.mean_[idx]) / scaler.scale_[idx]
+
+    grid = {k: v for k, v in WHATIF_GRID.items() if k in feature_names}
+    partial_dependence = {}
+    sensitivity = []
+    for feature, values in grid.items():
+        assignments = [dict([scaled(feature, v)]) for v in values]
+        means = _batched_mean_predictions(model, X_base, assignments)
+        partial_dependence[feature] = [
+            {'value': v, 'grade': float(m[0]), 'health': float(m[1])} for v, m in zip(values, means)
+        ]
+        sensitivity.append({
+            'feature': feature,
+            'grade_range': float(means[:, 0].max() - means[:, 0].min()),
+            'health_range': float(means[:, 1].max() - means[:, 1].min())
+        })
+
+    interactions = {}
+    for x_feature, y_feature in WHATIF_INTERACTIONS:
+        if x_feature not in grid or y_feature not in grid: continue
+        x_values, y_values = grid[x_feature], grid[y_feature]
+        assignments = [dict([scaled(x_feature, xv), scaled(y_feature, yv)]) for xv in x_values for yv in y_values]
+        means = _batched_mean_predictions(model, X_base, assignments).reshape(len(x_values), len(y_values), -1)
+        interactions[f'{x_feature}__{y_feature}'] = {
+            'x_feature': x_feature,
+            'y_feature': y_feature,
+            'x_values': x_values,
+            'y_values': y_values,
+            'grade': means[:, :, 0].round(4).tolist(),
+            'health': means[:, :, 1].round(4).tolist()
+        }
+
+    sensitivity.sort(key=lambda s: s['grade_range'] + s['health_range'], reverse=True)
+    return {
+        'n_rows': int(len(X_base)),
+        'n_training_rows': int(n_training_rows),
+        'sampled': bool(n_training_rows > len(X_base)),
+        'partial_dependence': partial_dependence,
+        'interactions': interactions,
+        'sensitivity': sensitivity
+    }
+
+# SECTION 4: MODEL TRAINING
+# ==============================================================================
+TARGET_COLUMNS = ['g3', 'health']
+DROPPED_COLUMNS = ['g3', 'health', 'dalc', 'walc']
+
+def _next_version(model_dir):
     perf_file_name = 'model_performance.json'
     try:
-        with open(perf_file_name, 'r') as f: old_performance = json.load(f)
+        with open(model_dir / perf_file_name, 'r') as f: old_performance = json.load(f)
     except FileNotFoundError: old_performance = {'version': 0, 'mse': 999}
-    new_version = old_performance.get('version', 0) + 1
-
-    df['social_sentiment'] = sentiment_score
-    df['social_veracity'] = veracity_score
-    df['total_alcohol'] = df['dalc'] + df['walc']
-    df_processed = pd.get_dummies(df, drop_first=True)
-    
-    y = df_processed[['g3', 'health']]
-    X = df_processed.drop(['g3', 'health', 'dalc', 'walc'], axis=1)
-    X = X.apply(pd.to_numeric, errors='coerce').fillna(0)
-    
-    scaler = StandardScaler().fit(X)
-    X_scaled = scaler.transform(X)
-    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y, test_size=0.2, random_state=42)
+    # Rejected challengers never reach the log, so skip past their artifacts too.
+    saved_versions = [int(p.stem.rsplit('_v', 1)[1]) for p in model_dir.glob('student_wellbeing_rf_v*.joblib')]
+    return max([old_performance.get('version', 0)] + saved_versions) + 1
 
+def _fit_model(X_train, y_train, new_version):
     print(f"Training RandomForest model: Version {new_version}...")
-    model = RandomForestRegressor(n_estimators=100, random_state=42, oob_score=True, n_jobs=-1)
-    model.fit(X_train, y_train)
-    
-    new_mse = mean_squared_error(y_test, model.predict(X_test))
-    print(f"\n--- New Model (V{new_version}) Evaluation ---")
-    print(f"Combined MSE (loss): {new_mse:.4f}")
-    
+    with stage('fit'):
+        model = RandomForestRegressor(n_estimators=100, random_state=42, oob_score=True, n_jobs=-1)
+        model.fit(X_train, y_train)
+    return model
+
+def _save_and_evaluate(model, scaler, feature_names, X_train, X_test, y_test, holdout, new_version, model_dir):
+    """Saves the versioned artifacts, then scores and caches the holdout evaluation."""
+    feature_names = list(feature_names)
     importances = model.feature_importances_
-    feature_names = X.columns
     feature_importance_df = pd.DataFrame({'feature': feature_names, 'importance': importances})
     feature_importance_df = feature_importance_df.sort_values(by='importance', ascending=False)
     
     print("\nTop 5 Most Important Features:")
     print(feature_importance_df.head(5))
 
-    model_dir = Path.home() / "StudentWellbeingProjectModels"
-    model_dir.mkdir(exist_ok=True)
-    
+    print("\nComputing population what-if tables...")
+    with stage('whatif_tables'):
+        whatif_tables = compute_whatif_tables(model, scaler, X_train, feature_names)
+    whatif_tables['version'] = new_version
+
     model_filename = model_dir / f'student_wellbeing_rf_v{new_version}.joblib'
     scaler_filename = model_dir / f'data_scaler_v{new_version}.joblib'
     columns_filename = model_dir / f'model_columns_v{new_version}.joblib'
     importance_filename = model_dir / f'feature_importance_v{new_version}.json'
+    whatif_filename = model_dir / f'whatif_tables_v{new_version}.json'
     
     print(f"\nSaving artifacts to: {model_dir}")
     try:
-        joblib.dump(model, model_filename)
-        joblib.dump(scaler, scaler_filename)
-        joblib.dump(feature_names.tolist(), columns_filename)
-        feature_importance_df.to_json(importance_filename, orient='records')
+        with stage('artifact_save'):
+            joblib.dump(model, model_filename)
+            joblib.dump(scaler, scaler_filename)
+            joblib.dump(feature_names, columns_filename)
+            feature_importance_df.to_json(importance_filename, orient='records')
+            with open(whatif_filename, 'w') as f: json.dump(whatif_tables, f)
         print("Model artifacts saved successfully.")
-        return new_version, new_mse
     except Exception as e:
         print(f"AN ERROR OCCURRED DURING ARTIFACT SAVING: {e}")
         return None, None
-        
 
-# SECTION 4: MAIN EXECUTION BLOCK
+    with stage('evaluation'):
+        evaluation, holdout_predictions = score_on_holdout(model, X_test, y_test)
+    # Outside the profiled stage: the profiler's tracemalloc session and stack
+    # sampler would inflate the latency and memory the promotion gate compares.
+    evaluation.update(measure_inference(model, X_test, model_filename))
+    save_evaluation(new_version, holdout['id'], evaluation, holdout_predictions, model_dir)
+    new_mse = evaluation['mse']
+    print(f"\n--- New Model (V{new_version}) Holdout Evaluation ---")
+    print(f"Combined MSE (loss): {new_mse:.4f}")
+    print(f"Latency p50/p95: {evaluation['latency_ms_p50']:.2f} / {evaluation['latency_ms_p95']:.2f} ms, "
+          f"predict peak memory: {evaluation['predict_peak_bytes'] / 1024:.1f} KiB")
+    return new_version, new_mse
+
+def train_and_save_model(df, sentiment_score, veracity_score, model_dir=None):
+    """
+    Trains a RandomForest model and saves all necessary artifacts, including
+    the crucial feature importances.
+    """
+    print("\n--- Starting Model Training Process ---")
+    
+    model_dir = Path(model_dir) if model_dir else Path.home() / "StudentWellbeingProjectModels"
+    model_dir.mkdir(parents=True, exist_ok=True)
+    new_version = _next_version(model_dir)
+
+    df['social_sentiment'] = sentiment_score
+    df['social_veracity'] = veracity_score
+    df['total_alcohol'] = df['dalc'] + df['walc']
+    with stage('dummies'):
+        df_processed = pd.get_dummies(df, drop_first=True)
+        y = df_processed[TARGET_COLUMNS]
+        X = df_processed.drop(DROPPED_COLUMNS, axis=1)
+        X = X.apply(pd.to_numeric, errors='coerce').fillna(0)
+    
+    with stage('scaling'):
+        scaler = StandardScaler().fit(X)
+        X_scaled = scaler.transform(X)
+    train_mask, holdout = load_or_create_holdout(X, y, model_dir)
+    X_train, y_train = X_scaled[train_mask], y[train_mask]
+    X_test, y_test = holdout_matrix(holdout, scaler, X.columns)
+
+    model = _fit_model(X_train, y_train, new_version)
+    return _save_and_evaluate(model, scaler, X.columns, X_train, X_test, y_test, holdout, new_version, model_dir)
+
+# SECTION 5: OUT-OF-CORE COMPACT TRAINING
 # ==============================================================================
+# For survey extracts too large for `train_and_save_model`. The CSV is read in
+# chunks twice (once to learn the schema, once to encode it) into a float32
+# memory-mapped matrix on disk; one-hot blocks are built as uint8, and the
+# scaler is fitted with `partial_fit` and applied in place chunk by chunk.
+
+def _is_text_column(series):
+    return not pd.api.types.is_numeric_dtype(series)
+
+def _scan_csv(csv_path, delimiter, chunksize):
+    """First pass: row count, column order and the category set of every text column."""
+    n_rows, columns, categories = 0, None, {}
+    for chunk in pd.read_csv(csv_path, sep=delimiter, chunksize=chunksize):
+        chunk.columns = [col.strip().lower() for col in chunk.columns]
+        if columns is None: columns = chunk.columns.tolist()
+        n_rows += len(chunk)
+        for col in chunk.columns:
+            if _is_text_column(chunk[col]):
+                categories.setdefault(col, set()).update(chunk[col].dropna().astype(str).unique())
+    categories = {col: sorted(categories[col]) for col in columns if col in categories}
+    return n_rows, columns, categories
+
+def _compact_layout(columns, categories, context_features):
+    """Feature names in the same order `pd.get_dummies(drop_first=True)` produces."""
+    numeric = [col for col in columns if col not in categories and col not in DROPPED_COLUMNS]
+    numeric += list(context_features) + ['social_sentiment', 'social_veracity', 'total_alcohol']
+    dummies = [f'{col}_{value}' for col, values in categories.items() if col not in DROPPED_COLUMNS for value in values[1:]]
+    return numeric, dummies
+
+def _encode_chunk(chunk, numeric, categories, context_features, sentiment_score, veracity_score):
+    """Returns (float32 numeric block, uint8 one-hot block, float32 targets) for one chunk."""
+    chunk.columns = [col.strip().lower() for col in chunk.columns]
+    for name, value in context_features.items(): chunk[name] = value
+    chunk['social_sentiment'] = sentiment_score
+    chunk['social_veracity'] = veracity_score
+    chunk['total_alcohol'] = chunk['dalc'] + chunk['walc']
+    numeric_block = chunk[numeric].apply(pd.to_numeric, errors='coerce').fillna(0).to_numpy(dtype=np.float32)
+    onehot_blocks = [
+        pd.get_dummies(pd.Categorical(chunk[col].astype(str), categories=values), drop_first=True, dtype=np.uint8).to_numpy()
+        for col, values in categories.items() if col not in DROPPED_COLUMNS
+    ]
+    onehot_block = np.hstack(onehot_blocks) if onehot_blocks else np.empty((len(chunk), 0), dtype=np.uint8)
+    return numeric_block, onehot_block, chunk[TARGET_COLUMNS].to_numpy(dtype=np.float32)
+
+def train_and_save_model_compact(csv_path, sentiment_score, veracity_score, context_features=None, chunksize=100_000, model_dir=None):
+    """
+    Low-memory variant of `train_and_save_model` that streams `csv_path` from
+    disk. Produces the same artifacts, plus `training_memory_v{N}.json` with
+    the peak RSS of every stage.
+
+    Everything up to the fit runs in bounded memory. The fit itself copies the
+    non-holdout rows of the scaled float32 matrix into RAM (n_train x
+    n_features x 4 bytes), and together with the forest that is the expected
+    peak of a compact run.
+    """
+    print("\n--- Starting Compact (Out-of-Core) Training Process ---")
+    context_features = context_features or {}
+    model_dir = Path(model_dir) if model_dir else Path.home() / "StudentWellbeingProjectModels"
+    model_dir.mkdir(parents=True, exist_ok=True)
+    new_version = _next_version(model_dir)
+    memory_report = []
+    delimiter = detect_delimiter(csv_path)
+
+    with track_peak_rss('scan', memory_report), stage('csv_parse'):
+        n_rows, columns, categories = _scan_csv(csv_path, delimiter, chunksize)
+        numeric, dummies = _compact_layout(columns, categories, context_features)
+        feature_names = numeric + dummies
+        print(f"Scanned {n_rows} rows -> {len(feature_names)} features ({len(dummies)} one-hot).")
+
+    work_dir = model_dir / 'compact_work'
+    work_dir.mkdir(exist_ok=True)
+    X_path, y_path = work_dir / f'X_v{new_version}.npy', work_dir / f'y_v{new_version}.npy'
+    try:
+        X = np.lib.format.open_memmap(X_path, mode='w+', dtype=np.float32, shape=(n_rows, len(feature_names)))
+        y = np.lib.format.open_memmap(y_path, mode='w+', dtype=np.float32, shape=(n_rows, len(TARGET_COLUMNS)))
+        n_numeric = len(numeric)
+
+        with track_peak_rss('encode', memory_report), stage('dummies'):
+            start = 0
+            for chunk in pd.read_csv(csv_path, sep=delimiter, chunksize=chunksize):
+                numeric_block, onehot_block, targets = _encode_chunk(chunk, numeric, categories, context_features, sentiment_score, veracity_score)
+                end = start + len(targets)
+                X[start:end, :n_numeric] = numeric_block
+                X[start:end, n_numeric:] = onehot_block
+                y[start:end] = targets
+                start = end
+            X.flush(); y.flush()
+
+        # The holdout keeps unscaled rows, so it must be drawn before scaling in place.
+        with track_peak_rss('holdout', memory_report):
+            def take_rows(positions): return pd.DataFrame(X[positions], columns=feature_names), y[positions]
+            blocks = ((X[start:start + chunksize], y[start:start + chunksize]) for start in range(0, n_rows, chunksize))
+            train_mask, holdout = load_or_create_holdout_rows(n_rows, take_rows, feature_names, blocks, model_dir)
+
+        with track_peak_rss('scale', memory_report), stage('scaling'):
+            scaler = StandardScaler()
+            for start in range(0, n_rows, chunksize):
+                scaler.partial_fit(pd.DataFrame(X[start:start + chunksize], columns=feature_names))
+            mean, scale = scaler.mean_.astype(np.float32), scaler.scale_.astype(np.float32)
+            for start in range(0, n_rows, chunksize):
+                block = X[start:start + chunksize]
+                block -= mean
+                block /= scale
+            X.flush()
+
+        with track_peak_rss('fit', memory_report):
+            # The holdout always exists, so this copies the training rows into RAM.
+            # (Fitting the memmap with zero weights on holdout rows avoids the
+            # copy but was slower and peaked higher: bootstrap and OOB then span
+            # every row.)
+            X_train, y_train = X[train_mask], y[train_mask]
+            X_test, y_test = holdout_matrix(holdout, scaler, feature_names)
+            model = _fit_model(X_train, y_train, new_version)
+
+        with track_peak_rss('save_and_evaluate', memory_report):
+            new_version, new_mse = _save_and_evaluate(model, scaler, feature_names, X_train, X_test, y_test, holdout, new_version, model_dir)
+    finally:
+        # The memmaps are scratch space; release every view and drop them even if training fails.
+        X = y = X_train = y_train = block = None
+        X_path.unlink(missing_ok=True)
+        y_path.unlink(missing_ok=True)
+    if new_version is not None:
+        with open(model_dir / f'training_memory_v{new_version}.json', 'w') as f:
+            json.dump({'version': new_version, 'rows': n_rows, 'features': len(feature_names), 'stages': memory_report}, f, indent=4)
+    return new_version, new_mse
+
+# SECTION 6: MAIN EXECUTION BLOCK
+# ==============================================================================
+def _print_next_step(new_version, new_mse):
+    print("\n" + "="*60)
+    print("--- Training complete. PLEASE FOLLOW THE NEXT STEP CAREFULLY. ---")
+    print("\n1. OPEN A NEW, SEPARATE TERMINAL WINDOW.")
+    print("2. Navigate back to your project directory in the new terminal.")
+    print("3. Run the following command EXACTLY as shown to finalize the log:")
+    print("\n" + "="*20 + " RUN THIS COMMAND NEXT " + "="*20)
+    print(f"python log_updater.py --version {new_version} --mse {new_mse}")
+    print("\n(The model is only promoted if it beats the current champion; add --force to override.)")
+    print("="*60)
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Train the student wellbeing model.')
+    parser.add_argument('--low-memory', action='store_true', help='Stream the student CSV from disk with compact dtypes.')
+    parser.add_argument('--data-path', help='Student CSV for --low-memory (default: the downloaded student-mat.csv).')
+    parser.add_argument('--chunksize', type=int, default=100_000, help='Rows per chunk in --low-memory mode.')
+    parser.add_argument('--profile', action='store_true', help='Profile each stage (see profiling.py).')
+    args = parser.parse_args()
+    if args.profile: enable_profiling()
+
+    if args.low_memory:
+        downloaded_paths = download_datasets()
+        data_path = args.data_path
+        if data_path is None and downloaded_paths.get('student_alcohol'):
+            data_path = os.path.join(downloaded_paths['student_alcohol'], "student-mat.csv")
+        if data_path is None:
+            print("Could not locate the student dataset. Exiting pipeline.")
+            sys.exit(1)
+        fresh_sentiment, avg_veracity = load_scraped_data()
+        try:
+            new_version, new_mse = train_and_save_model_compact(
+                data_path, fresh_sentiment, avg_veracity, load_context_features(downloaded_paths), chunksize=args.chunksize)
+        except HoldoutMismatchError as e:
+            print(f"\nTraining stopped: {e}")
+            sys.exit(1)
+        if new_version is not None: _print_next_step(new_version, new_mse)
+        else: print("\nTraining pipeline failed during artifact saving.")
+        sys.exit(0)
+
     enriched_df = load_and_enrich_data()
     
     if enriched_df is not None:
         fresh_sentiment, avg_veracity = load_scraped_data()
-        new_version, new_mse = train_and_save_model(enriched_df.copy(), fresh_sentiment, avg_veracity)
+        try:
+            new_version, new_mse = train_and_save_model(enriched_df.copy(), fresh_sentiment, avg_veracity)
+        except HoldoutMismatchError as e:
+            print(f"\nTraining stopped: {e}")
+            sys.exit(1)
         
         if new_version is not None:
-            print("\n" + "="*60)
-            print("--- Training complete. PLEASE FOLLOW THE NEXT STEP CAREFULLY. ---")
-            print("\n1. OPEN A NEW, SEPARATE TERMINAL WINDOW.")
-            print("2. Navigate back to your project directory in the new terminal.")
-            print("3. Run the following command EXACTLY as shown to finalize the log:")
-            print("\n" + "="*20 + " RUN THIS COMMAND NEXT " + "="*20)
-            print(f"python log_updater.py --version {new_version} --mse {new_mse}")
-            print("="*60)
+            _print_next_step(new_version, new_mse)
         else:
             print("\nTraining pipeline failed during artifact saving.")
             